@@ -83,6 +83,20 @@ GET_SERIES_DETAILS = '/'.join(
     ]
 )
 
+# episodes per page of a series listing
+SERIES_PAGE_SIZE = 50
+
+# minutes a resolved regional radio station is considered fresh
+STATION_TTL = 1440
+
+# minutes GetTiles tiles and remote search results are cached for
+TILE_TTL = 360
+SEARCH_TTL = 360
+
+# minutes the local search keeps a tile it has not seen again, and the number of recent searches kept
+SEARCH_INDEX_TTL = 10080
+RECENT_SEARCHES = 20
+
 # requires codename to get stream links (eg. ept1-live) - GET METHOD
 ACQUIRE_CONTENT = '/'.join(
     [
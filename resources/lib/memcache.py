@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+
+'''
+    ERTflix Addon
+    Author Twilight0
+
+    SPDX-License-Identifier: GPL-3.0-only
+    See LICENSES/GPL-3.0-only for more information.
+'''
+
+from __future__ import absolute_import
+
+import json
+from collections import OrderedDict
+from functools import wraps
+from threading import Lock, local
+from time import time
+
+
+def _copy(value):
+
+    # listings are lists of flat dicts that routes update in place, hand out copies so the stored value stays intact
+    if isinstance(value, list):
+        return [dict(i) if isinstance(i, dict) else i for i in value]
+    elif isinstance(value, dict):
+        return dict(value)
+    else:
+        return value
+
+
+def _size(value):
+
+    try:
+        return len(json.dumps(value))
+    except (TypeError, ValueError):
+        return len(repr(value))
+
+
+class MemoryCache(object):
+
+    """
+    Process-local LRU layer, it lives as long as the interpreter does, which under reuselanguageinvoker
+    spans several navigations. Entries expire after the duration of the function they belong to and the
+    store is bounded by entry count and by approximate (serialized) size in bytes.
+    """
+
+    # totals of every instance, for the profiler
+    counters = {'hits': 0, 'disk_hits': 0, 'misses': 0}
+
+    def __init__(self, max_entries=64, max_bytes=8388608):
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.counts = {'hits': 0, 'disk_hits': 0, 'misses': 0}
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = Lock()
+
+    def get(self, key, count=True):
+
+        """
+        Returns (value, True) or (None, False), callers with a tier of their own behind this one pass count=False
+        and count() the lookup once they know which tier answered it
+        """
+
+        with self._lock:
+
+            entry = self._entries.pop(key, None)
+
+            if entry is None or entry[0] < time():
+                if entry is not None:
+                    self._bytes -= entry[2]
+                if count:
+                    self.count('misses')
+                return None, False
+
+            self._entries[key] = entry
+
+            if count:
+                self.count('hits')
+
+            return entry[1], True
+
+    def count(self, outcome):
+
+        """
+        Counts a lookup as answered from memory ('hits'), from the disk tier ('disk_hits') or by running the
+        function ('misses')
+        """
+
+        self.counts[outcome] += 1
+        MemoryCache.counters[outcome] += 1
+
+    def set(self, key, value, seconds):
+
+        size = _size(value)
+
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+
+            old = self._entries.pop(key, None)
+
+            if old is not None:
+                self._bytes -= old[2]
+
+            self._entries[key] = (time() + seconds, value, size)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._bytes -= self._entries.popitem(last=False)[1][2]
+
+    def delete(self, key):
+
+        with self._lock:
+
+            entry = self._entries.pop(key, None)
+
+            if entry is not None:
+                self._bytes -= entry[2]
+
+    def clear(self):
+
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+
+        return dict(self.counts, entries=len(self._entries), bytes=self._bytes)
+
+    def cache_function(self, duration, disk_cache_function=None, disk_hit_seconds=300):
+
+        """
+        Memory tier in front of disk_cache_function (tulip's). A value computed here is kept duration minutes,
+        as long as the disk tier keeps it. A value the disk tier answered with is already part way through its
+        life there and tulip does not tell how far, so it is kept disk_hit_seconds at most, memory never outlives
+        the disk entry by more than that.
+        """
+
+        def decorator(func):
+
+            computed = local()
+
+            @wraps(func)
+            def compute(*args, **kwargs):
+                computed.value = True
+                return func(*args, **kwargs)
+
+            cached = disk_cache_function(duration)(compute) if disk_cache_function else compute
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+
+                key = repr((func.__module__, func.__name__, args, sorted(kwargs.items())))
+
+                value, hit = self.get(key, count=False)
+
+                if hit:
+                    self.count('hits')
+                else:
+                    computed.value = False
+                    value = cached(*args, **kwargs)
+                    self.count('misses' if computed.value else 'disk_hits')
+                    if value:
+                        self.set(key, value, duration * 60 if computed.value else min(duration * 60, disk_hit_seconds))
+
+                return _copy(value)
+
+            return wrapper
+
+        return decorator
@@ -12,16 +12,22 @@ from __future__ import absolute_import
 
 import json, re
 from os.path import split
+from threading import Lock, Thread
+from time import time
 from .constants import *
-from .utils import geo_detect, collection_post, tiles_post, live_post, search_post
-from tulip import bookmarks as bms, directory, client, cache, control
+from . import net
+from .utils import region_allowed, region_filter, prefetch, forget, collection_post, live_post, search_post, cache_function, initial_state
+from .utils import keys_registration
+from .profiler import measure
+from .scraper import Scraper
+from .store import in_foreground
+from .utils import store, index_store, search_index, recent_store, station_store
+from .tiles import labels as tile_labels, tile_item, get_tiles
+from .search import tokens
+from tulip import bookmarks as bms, directory, client, control
 from tulip.compat import iteritems, range, concurrent_futures, quote, parse_qs
 from tulip.parsers import parseDOM, itertags
 from tulip.url_dispatcher import urldispatcher
-from youtube_resolver import resolve as yt_resolver
-
-
-cache_function = cache.FunctionCache().cache_function
 
 
 @urldispatcher.register('root')
@@ -120,13 +126,12 @@ def root():
             'icon': 'index.jpg'
         }
         ,
-        # {
-        #     'title': control.lang(30013),
-        #     'action': 'search',
-        #     'icon': 'search.jpg',
-        #     'isFolder': 'False', 'isPlayable': 'False'
-        # }
-        # ,
+        {
+            'title': control.lang(30013),
+            'action': 'search',
+            'icon': 'search.jpg'
+        }
+        ,
         {
             'title': control.lang(30012),
             'action': 'bookmarks',
@@ -179,10 +184,7 @@ def bookmarks():
         directory.add(na)
         return
 
-    for i in self_list:
-        bookmark = dict((k, v) for k, v in iteritems(i) if not k == 'next')
-        bookmark['delbookmark'] = i['url']
-        i.update({'cm': [{'title': 30502, 'query': {'action': 'deleteBookmark', 'url': json.dumps(bookmark)}}]})
+    items = bookmark_menu(self_list, 30502, cm_action='deleteBookmark', key='delbookmark')
 
     if control.setting('bookmarks_clear_boolean') == 'true':
 
@@ -190,7 +192,12 @@ def bookmarks():
             'title': control.lang(30059), 'action': 'clear_bookmarks', 'isFolder': 'False', 'isPlayable': 'False'
         }
 
-        self_list.insert(0, clear_menu)
+        self_list = [clear_menu]
+        self_list.extend(items)
+
+    else:
+
+        self_list = list(items)
 
     control.sortmethods()
     control.sortmethods('title')
@@ -198,10 +205,40 @@ def bookmarks():
     directory.add(self_list, content='videos')
 
 
+# json.dumps with any argument builds a new encoder on every call, this one is built once
+_compact = json.JSONEncoder(separators=(',', ':')).encode
+
+
+def bookmark_menu(items, label=30501, cm_action='addBookmark', key='bookmark', title=None, **fields):
+
+    """
+    Yields items with fields set and their bookmark context menu (dispatching cm_action) attached. The payload
+    is the item itself (minus the next page url) serialized compactly, items without a url get no menu.
+    """
+
+    for i in items:
+
+        if fields:
+            i.update(fields)
+
+        if 'url' in i:
+
+            bookmark = dict(i)
+            bookmark.pop('next', None)
+            bookmark[key] = i['url']
+
+            if title:
+                bookmark['title'] = title(i)
+
+            i['cm'] = [{'title': label, 'query': {'action': cm_action, 'url': _compact(bookmark)}}]
+
+        yield i
+
+
 @cache_function(3600)
-def get_live():
+def get_live(lazy=False):
 
-    FilterNowOnTvTiles = client.request(FILTER_NOW_ON_TV_TILES, output='json')
+    FilterNowOnTvTiles = net.request(FILTER_NOW_ON_TV_TILES, output='json')
 
     channels = FilterNowOnTvTiles['Channels']
 
@@ -212,16 +249,25 @@ def get_live():
         c = {'id': channel['Id']}
         fnotvtiles_channel_list.append(c)
 
-    GetTiles = client.request(GET_TILES, post=live_post(fnotvtiles_channel_list), output='json')
+    GetTiles = net.request(GET_TILES, post=live_post(fnotvtiles_channel_list), output='json')
 
     stations = GetTiles['tiles']
 
-    self_list = []
+    if lazy:
+        # streams are acquired by the play route, only when a channel is selected
+        return [item for item in [_live_loop(station, lazy=True) for station in stations] if item]
+
+    with concurrent_futures.ThreadPoolExecutor(5) as executor:
 
-    for station in stations:
+        # map() keeps the channel order of GetTiles, malformed tiles come back as None
+        self_list = [item for item in executor.map(_live_loop, stations) if item]
 
-        if station['isRegionRestrictionEnabled'] and not geo_detect:
-            continue
+    return self_list
+
+
+def _live_loop(station, lazy=False):
+
+    try:
 
         title = station['title']
         image = station['images'][0]['url']
@@ -230,18 +276,44 @@ def get_live():
             codename = station['tileChannel']['codename']
         except KeyError:
             codename = station['codename']
-        acquire_content = client.request(ACQUIRE_CONTENT.format(DEVICE_KEY, codename), output='json')
-        url = acquire_content['MediaFiles'][0]['Formats'][0]['Url']
-        data = {'title': title.replace(' LIVE', ''), 'image': image, 'fanart': fanart, 'url': url}
-        self_list.append(data)
 
-    return self_list
+        data = {
+            'title': title.replace(' LIVE', ''), 'image': image, 'fanart': fanart,
+            'url': ACQUIRE_CONTENT.format(DEVICE_KEY, codename), 'restricted': station['isRegionRestrictionEnabled']
+        }
+
+    except Exception:
+
+        # one malformed tile does not cost the other channels
+        return
+
+    if not lazy:
+        try:
+            data['url'] = live_resolve(data['url'])
+        except Exception:
+            # the channel stays listed for as long as the list is cached, the play route acquires its stream
+            pass
+
+    return data
+
+
+def live_resolve(url):
+
+    acquire_content = net.request(url, output='json', timeout=10)
+
+    return acquire_content['MediaFiles'][0]['Formats'][0]['Url']
+
+
+@cache_function(30)
+def cached_live_resolve(url):
+
+    return live_resolve(url)
 
 
 @urldispatcher.register('live')
 def live():
 
-    self_list = get_live()
+    self_list = region_filter(get_live(control.setting('lazy_live') == 'true'))
 
     for i in self_list:
         i.update({'action': 'play', 'isFolder': 'false'})
@@ -249,31 +321,69 @@ def live():
     directory.add(self_list)
 
 
-@cache_function(2880)
+@cache_function(2880, revalidate=True)
 def index_listing():
 
-    html = client.request(INDEX_LINK)
+    html = net.request(INDEX_LINK)
 
-    li = parseDOM(html, 'li')
+    # li.hideli entries are already part of the li list, entries are keyed by url to drop any repeats
+    entries = {}
 
-    li.extend(parseDOM(html, 'li', attrs={'class': 'hideli'}))
+    with measure('parse'):
 
-    items = [i for i in li if 'title' in i]
+        for item in parseDOM(html, 'li'):
 
-    self_list = []
+            if 'title' not in item:
+                continue
 
-    for item in items:
+            url = parseDOM(item, 'a', ret='href')[0]
 
-        title = client.replaceHTMLCodes(parseDOM(item, 'a')[0])
-        url = parseDOM(item, 'a', ret='href')[0]
+            if url not in entries:
+                entries[url] = client.replaceHTMLCodes(parseDOM(item, 'a')[0])
 
-        self_list.append({'title': title, 'url': url})
+    update_index(entries)
+
+    self_list = [{'title': title, 'url': url} for url, title in iteritems(entries)]
 
     self_list.sort(key=lambda k: k['title'].lower())
 
     return self_list
 
 
+def update_index(entries):
+
+    """
+    Brings the stored index ({url: title}) in line with the one just parsed, writing only the entries that were
+    added, renamed or removed. Show pages of renamed & removed entries are dropped from the cache, the rest are
+    left to their own expiry, as new episodes do not show on the index.
+    """
+
+    stored = index_store.items()
+
+    changed = [(url, title) for url, title in iteritems(entries) if stored.get(url) != title]
+    removed = [url for url in stored if url not in entries]
+
+    if changed:
+        index_store.set_many(changed)
+
+    if removed:
+        index_store.delete_many(removed)
+
+    try:
+        search_index.add(
+            (
+                'idx:' + url, title,
+                {'item': {'title': title, 'url': url, 'action': 'sub_index'}, 'restricted': False}
+            ) for url, title in changed
+        )
+        search_index.remove('idx:' + url for url in removed)
+    except Exception:
+        pass
+
+    for url in removed + [url for url, _ in changed if url in stored]:
+        forget(sub_index_listing, url)
+
+
 @urldispatcher.register('index')
 def index():
 
@@ -282,15 +392,7 @@ def index():
     except Exception:
         return
 
-    for i in self_list:
-        i.update({'action': 'sub_index'})
-
-    for i in self_list:
-        bookmark = dict((k, v) for k, v in iteritems(i) if not k == 'next')
-        bookmark['bookmark'] = i['url']
-        i.update({'cm': [{'title': 30006, 'query': {'action': 'addBookmark', 'url': json.dumps(bookmark)}}]})
-
-    directory.add(self_list, content='videos')
+    directory.add(list(bookmark_menu(self_list, 30006, action='sub_index')), content='videos')
 
 
 @urldispatcher.register('sub_index', ['url'])
@@ -298,22 +400,15 @@ def sub_index(url):
 
     self_list = sub_index_listing(url)
 
-    for i in self_list:
-        try:
-            bookmark = dict((k, v) for k, v in iteritems(i) if not k == 'next')
-            bookmark['bookmark'] = i['url']
-            bookmark['title'] = i['title'].rpartition(' - ')[0]
-            i.update({'cm': [{'title': 30501, 'query': {'action': 'addBookmark', 'url': json.dumps(bookmark)}}]})
-        except KeyError:
-            pass
-
-    directory.add(self_list, content='videos')
+    directory.add(
+        list(bookmark_menu(self_list, title=lambda i: i['title'].rpartition(' - ')[0])), content='videos'
+    )
 
 
-@cache_function(3600)
+@cache_function(3600, revalidate=True)
 def sub_index_listing(url):
 
-    html = client.request(url)
+    html = net.request(url)
 
     name = client.parseDOM(html, 'h1', attrs={'class': 'tdb-title-text'})[0]
     name = client.replaceHTMLCodes(name)
@@ -383,197 +478,182 @@ def read_plot():
     control.dialog.textviewer(heading=heading, text=plot)
 
 
-@cache_function(1800)
-def recursive_list_items(url):
+def api_link(url):
 
-    page = 1
+    """
+    Translates ertflix /show/<page> and /list?...&sectionCodename=<section> urls to the API calls returning
+    the same data as json, None when there is no equivalent call (e.g. pages of other sites)
+    """
 
-    if url.startswith('https'):
+    if url.startswith(BASE_API_LINK):
+        return url
+    elif not url.startswith(BASE_LINK):
+        return
 
-        if BASE_API_LINK not in url:
-            html = client.request(url)
-            script = [i for i in client.parseDOM(html, 'script') if 'INITIAL_STATE' in i][0]
-            script = re.sub(r'var _*?\w+_*? = ', '', script).replace(';</script>', '')
-            if script.endswith(';'):
-                script = script[:-1]
-            _json = json.loads(script)
-        else:
-            _json = client.request(url, output='json')
+    path, _, query = url.partition('?')
 
-        if '/list' in url:
+    if path.endswith('/list'):
+        codename = parse_qs(query).get('sectionCodename')
+        if codename:
+            return GET_SECTION.format(1, codename[0])
+    elif '/show/' in path and split(path)[1]:
+        return GET_PAGE_CONTENT.format(1, split(path)[1])
 
-            codename = split(url)[1].partition('=')[2]
-            total_pages = _json['pages']['sectionsByCodename'][codename]['totalPages']
-            page = _json['pages']['sectionsByCodename'][codename]['fetchedPage']
-            tiles = _json['pages']['sectionsByCodename'][codename]['tilesIds']
-            tiles_post_list = [{'id': i} for i in tiles]
 
-        else:
+def page_tiles(url):
+
+    """
+    Returns the tile ids, fetched page, total pages and next page url of an ertflix /show or /list url,
+    the INITIAL_STATE of the html page is only scraped when the API call is not available, fails or comes
+    back empty
+    """
 
-            tiles = []
-            if 'GetSeriesDetails' in url:
+    link = api_link(url)
 
-                episode_groups = _json['episodeGroups']
+    if link:
 
-                for group in episode_groups:
-                    episodes = group['episodes']
-                    for episode in episodes:
-                        codename = episode['id']
-                        tiles.append(codename)
+        try:
 
-                tiles_post_list = [{'id': i} for i in tiles]
-                total_pages = 1
+            _json = net.request(link, output='json')
 
+            if 'GetSectionContent' in link:
+                codename = parse_qs(link.partition('?')[2])['sectionCodename'][0]
+                page = _json['pagination']['page']
+                result = (
+                    _json['sectionContent']['tilesIds'], page, _json['pagination']['totalPages'],
+                    GET_SECTION.format(page + 1, codename)
+                )
             else:
+                tiles = []
+                for section in _json['sectionContents']:
+                    if 'adman' not in section['sectionContentCodename']:
+                        tiles.extend(section['tilesIds'])
+                result = tiles, 1, 1, None
 
-                codenames = list(_json['pages']['sectionsByCodename'].keys())
-                for codename in codenames:
-                    tiles_list = _json['pages']['sectionsByCodename'][codename]['tilesIds']
-                    tiles.extend(tiles_list)
-                tiles_post_list = [{'id': i} for i in tiles]
-                total_pages = 1
+        except Exception:
 
-    else:
+            if link == url:
+                raise
 
-        if url.startswith('{"platformCodename":"www"'):
-            collection_json = json.loads(url)
-            url = collection_json['orCollectionCodenames']
-            page = collection_json['page']
+            result = None
 
-        filter_tiles = client.request(FILTER_TILES, post=collection_post(url, page), output='json')
-        total_pages = filter_tiles['pagination']['totalPages']
-        page = filter_tiles['pagination']['page']
-        tiles = filter_tiles['tiles']
-        tiles_post_list = [{'id': i['id']} for i in tiles]
+        # an empty answer would be cached as an empty listing, the page itself is tried instead
+        if result and (result[0] or link == url):
+            return result
+
+    _json = initial_state(net.request(url))
+    sections = _json['pages']['sectionsByCodename']
+
+    if '/list' in url:
+
+        codename = split(url)[1].partition('=')[2]
+        section = sections[codename]
+
+        return section['tilesIds'], section['fetchedPage'], section['totalPages'], None
 
-    if total_pages > 1 and page < total_pages:
-        page = page + 1
-        next_post = collection_post(url, page)
     else:
-        next_post = None
 
-    get_tiles = client.request(GET_TILES, post=tiles_post(tiles_post_list), output='json')
-    tiles_list = get_tiles['tiles']
+        tiles = []
+        for codename in list(sections.keys()):
+            tiles.extend(sections[codename]['tilesIds'])
 
-    self_list = []
+        return tiles, 1, 1, None
 
-    for tile in tiles_list:
 
-        if tile['isRegionRestrictionEnabled'] and not geo_detect:
-            continue
+@cache_function(1800)
+def series_episodes(url):
 
-        title = tile['title']
-        if 'subtitle' in tile:
-            title = ' - '.join([title, tile['subtitle']])
-        try:
-            if tile.get('isEpisode'):
-                try:
-                    season = ' '.join([control.lang(30063), str(tile['season']['seasonNumber'])])
-                except KeyError:
-                    season = None
-                if not season:
-                    subtitle = ' '.join([control.lang(30064), str(tile['episodeNumber'])])
-                else:
-                    try:
-                        subtitle = ''.join(
-                            [
-                                season, ', ', control.lang(30064),
-                                ' ', str(tile['episodeNumber'])
-                            ]
-                        )
-                    except KeyError:
-                        subtitle = tile['publishDate'].partition('T')[0]
-                        subtitle = '/'.join(subtitle.split('-')[::-1])
-                title = '[CR]'.join([title, subtitle])
-        except Exception:
-            pass
+    _json = net.request(url, output='json')
 
-        images = tile['images']
-        fanart = control.fanart()
+    episode_groups = _json['episodeGroups']
 
-        if len(images) == 1:
+    return [[episode['id'] for episode in group['episodes']] for group in episode_groups]
 
-            image = images[0]['url']
 
-        else:
+def series_tiles(url, size=SERIES_PAGE_SIZE):
 
-            image_list = [
-                [i['url'] for i in images if i['isMain']], [i['url'] for i in images if i['role'] == 'hbbtv-icon'],
-                [i['url'] for i in images if i['role'] == 'photo'], [i['url'] for i in images if i['role'] == 'hbbtv-background']
-            ]
-
-            image = images[0]['url']
-
-            for i in image_list:
-                if i:
-                    image = i[0]
-                    break
-
-            fanart_list = [
-                [i['url'] for i in images if i['role'] == 'photo-details'],
-                [i['url'] for i in images if i['role'] == 'hbbtv-background'],
-                [i['url'] for i in images if i['role'] == 'photo' and 'ertflix-background' in i['url']]
-            ]
-
-            for f in fanart_list:
-                if f and len(f) > 1:
-                    fanart = f[1]
-                    break
-                elif f and len(f) == 1:
-                    fanart = f[0]
-                    break
-
-        codename = tile['codename']
-        vid = tile['id']
-
-        plots = [
-            tile.get('description'), tile.get('shortDescription'), tile.get('tinyDescription'), tile.get('subtitle'),
-            tile.get('subTitle')
-        ]
+    """
+    Returns one page of episode ids of a GetSeriesDetails url, along with page, total pages and next page url.
+    Pages hold up to size episodes and never span two episode groups, the page number travels in the url. A page
+    past the end (e.g. bookmarked before the series got shorter) is taken as the last one.
+    """
 
-        plot = control.lang(30014)
+    url, _, page = url.partition('&episodePage=')
 
-        for p in plots:
-            if p:
-                plot = client.stripTags(p)
-                plot = client.replaceHTMLCodes(plot)
-                break
+    pages = []
 
-        year = tile.get('year')
+    for episodes in series_episodes(url):
+        pages.extend(episodes[i:i + size] for i in range(0, len(episodes), size))
 
-        if not year:
-            try:
-                year = int(tile.get('productionYears')[:4])
-            except Exception:
-                year = 2021
+    if not pages:
+        return [], 1, 1, None
+
+    page = max(1, min(int(page or 1), len(pages)))
+
+    return pages[page - 1], page, len(pages), '&episodePage='.join([url, str(page + 1)])
+
+
+@cache_function(1800, revalidate=True)
+def recursive_list_items(url):
+
+    page = 1
+    next_url = None
+
+    if url.startswith('https'):
+
+        if 'GetSeriesDetails' in url:
+
+            tiles, page, total_pages, next_url = series_tiles(url)
 
-        if tile.get('hasPlayableStream') and not tile.get('type') == 'ser':
-            url = VOD_LINK.format('-'.join([vid, codename]))
         else:
-            url = GET_SERIES_DETAILS.format(vid)
 
-        data = {
-            'title': title, 'image': image, 'fanart': fanart, 'url': url, 'plot': plot,
-            'year': year
+            tiles, page, total_pages, next_url = page_tiles(url)
+
+        tiles_post_list = [{'id': i} for i in tiles]
+
+    else:
+
+        if url.startswith('{"platformCodename":"www"'):
+            collection_json = json.loads(url)
+            url = collection_json['orCollectionCodenames']
+            page = collection_json['page']
+
+        filter_tiles = net.request(FILTER_TILES, post=collection_post(url, page), output='json')
+        total_pages = filter_tiles['pagination']['totalPages']
+        page = filter_tiles['pagination']['page']
+        tiles = filter_tiles['tiles']
+        tiles_post_list = [{'id': i['id']} for i in tiles]
+
+    if total_pages > 1 and page < total_pages:
+        page = page + 1
+        next_post = next_url or collection_post(url, page)
+    else:
+        next_post = None
+
+    tiles_list = get_tiles(tiles_post_list)
+
+    labels = tile_labels()
+
+    if next_post:
+        next_item = {
+            'next': next_post, 'nextaction': 'listing', 'nextlabel': 30500, 'nexticon': control.addonmedia('next.jpg')
         }
+    else:
+        next_item = None
 
-        if tile.get('durationSeconds'):
-            data.update({'duration': tile.get('durationSeconds')})
+    self_list = []
 
-        if next_post:
-            data.update(
-                {
-                    'next': next_post, 'nextaction': 'listing', 'nextlabel': 30500,
-                    'nexticon': control.addonmedia('next.jpg')
-                }
-            )
+    with measure('parse'):
 
-        if tile.get('hasPlayableStream') and not tile.get('type') == 'ser':
-            data.update({'action': 'play', 'isFolder': 'False'})
-        else:
-            data.update({'action': 'listing'})
+        for tile in tiles_list:
 
-        self_list.append(data)
+            data = tile_item(tile, labels)
+            data['restricted'] = tile['isRegionRestrictionEnabled']
+
+            if next_item:
+                data.update(next_item)
+
+            self_list.append(data)
 
     return self_list
 
@@ -581,35 +661,39 @@ def recursive_list_items(url):
 @urldispatcher.register('listing', ['url'])
 def listing(url):
 
-    self_list = recursive_list_items(url)
-
-    for i in self_list:
-        bookmark = dict((k, v) for k, v in iteritems(i) if not k == 'next')
-        bookmark['bookmark'] = i['url']
-        i.update({'cm': [{'title': 30501, 'query': {'action': 'addBookmark', 'url': json.dumps(bookmark)}}]})
+    self_list = list(bookmark_menu(region_filter(recursive_list_items(url))))
 
     directory.add(self_list, content='videos')
 
+    if self_list and self_list[-1].get('next'):
+        prefetch(recursive_list_items, self_list[-1]['next'])
 
-@cache_function(1800)
+
+@cache_function(1800, revalidate=True)
 def category_list(url):
 
-    if BASE_API_LINK in url:
+    link = api_link(url)
 
-        _json = client.request(url, output='json')
-        list_of_lists = _json['sectionContents']
-        codename = parse_qs(split(url)[1])['pageCodename'][0]
-        page = _json['pagination']['page']
-        total_pages = _json['pagination']['totalPages']
+    if link:
 
-    else:
+        try:
+            _json = net.request(link, output='json')
+            list_of_lists = [i for i in _json['sectionContents'] if 'adman' not in i['sectionContentCodename']]
+            codename = parse_qs(split(link)[1])['pageCodename'][0]
+            page = _json['pagination']['page']
+            total_pages = _json['pagination']['totalPages']
+        except Exception:
+            if link == url:
+                raise
+            link = None
+        else:
+            # same as a failure when the page itself can be scraped, rather than caching an empty listing
+            if link != url and not any(i['tilesIds'] for i in list_of_lists):
+                link = None
+
+    if not link:
 
-        html = client.request(url)
-        script = [i for i in client.parseDOM(html, 'script') if 'INITIAL_STATE' in i][0]
-        script = re.sub(r'var _*?\w+_*? = ', '', script).partition(';</script>')[0]
-        if script.endswith(';'):
-            script = script[:-1]
-        _json = json.loads(script)
+        _json = initial_state(net.request(url))
         pages = _json['pages']
         list_of_lists = [i for i in list(pages['sectionsByCodename'].values()) if 'adman' not in i['sectionContentCodename']]
         codename = list(pages.keys())[-1]
@@ -664,13 +748,109 @@ def categories(url):
 
     directory.add(self_list)
 
+    if self_list and self_list[-1].get('next'):
+        prefetch(category_list, self_list[-1]['next'])
+
+
+def search_key(query):
+
+    return u' '.join(sorted(tokens(query)))
+
+
+def remote_search(query, duration=SEARCH_TTL):
+
+    """
+    Tile ids the SEARCH API returns for query, cached per normalized query (case, accents & word order do not
+    matter), so repeating or re-typing a search does not reach the API again within duration minutes
+    """
+
+    key = u'search:' + search_key(query)
+    entry = store.get(key)
+
+    if entry and time() - entry[0] < duration * 60:
+        return entry[1]
+
+    _json = net.request(SEARCH, post=search_post(query), output='json')
+
+    ids = [t['id'] for t in _json['tiles']]
+
+    store.set(key, ids)
+
+    return ids
+
+
+def search_page(query, page, size=50):
+
+    ids = remote_search(query)
+
+    allowed = region_allowed()
+    labels = tile_labels()
+
+    self_list = [
+        tile_item(t, labels) for t in get_tiles([{'id': i} for i in ids[(page - 1) * size:page * size]])
+        if allowed or not t['isRegionRestrictionEnabled']
+    ]
+
+    if page * size < len(ids):
+
+        next_item = {
+            'next': json.dumps({'query': query, 'page': page + 1}), 'nextaction': 'search', 'nextlabel': 30500,
+            'nexticon': control.addonmedia('next.jpg')
+        }
+
+        for i in self_list:
+            i.update(next_item)
+
+    return self_list
+
+
+@urldispatcher.register('search', kwargs=['url'])
+def search(url=None):
 
-# @urldispatcher.register('search')
-# def search():
-#
-#     input_str = control.inputDialog()
-#
-#     _json = client.request(SEARCH, post=search_post(input_str), output='json')
+    if not url:
+
+        self_list = [
+            {
+                'title': control.lang(30056), 'action': 'search', 'url': json.dumps({'query': None}),
+                'icon': 'search.jpg'
+            }
+        ]
+
+        for query in recent_store.latest(RECENT_SEARCHES):
+            self_list.append(
+                {'title': query, 'action': 'search', 'url': json.dumps({'query': query}), 'icon': 'search.jpg'}
+            )
+
+        directory.add(self_list)
+
+        return
+
+    params = json.loads(url)
+    # Kodi's keyboard only hands back the term once it is confirmed, there are no keystrokes to debounce, a
+    # repeated search is answered by the cache of remote_search instead
+    query = params.get('query') or control.inputDialog()
+    page = params.get('page', 1)
+
+    self_list = []
+
+    if not query or not search_key(query):
+        # cancelled, the folder still needs its directory
+        query = None
+    elif page == 1:
+        recent_store.set(search_key(query), query)
+
+    if query and page == 1:
+        # the local index covers everything browsed so far, the API is only asked when it has nothing
+        allowed = region_allowed()
+        self_list = [d['item'] for d in search_index.search(query) if allowed or not d['restricted']]
+
+    if query and not self_list:
+        self_list = search_page(query, page)
+
+    if not self_list:
+        self_list = [{'title': control.lang(30071), 'action': None}]
+
+    directory.add(self_list, content='videos')
 
 
 @urldispatcher.register('radios')
@@ -726,46 +906,134 @@ def radios():
     directory.add(self_list)
 
 
-def _radio_loop(station):
+def _radio_loop(station, scraper):
+
+    title = station['title']
+    href = station['href']
+
+    entry = station_store.get(href)
+
+    # only stations whose page or player changed are scraped again
+    if entry and scraper.unchanged(entry[1]['validators']):
+        station_store.set(href, dict(entry[1], healthy=True))
+        return dict(entry[1]['item'], title=title)
+
+    net.record()
+
+    try:
+        html = scraper.fetch(href, as_bytes=True)
+        html = html.decode('windows-1253')
+        link = parseDOM(html, 'iframe', ret='src')[0]
+        embed = scraper.fetch(link)
+    finally:
+        validators = net.recorded()
 
-    title = parseDOM(station, 'a')[0]
-    href = parseDOM(station, 'a', ret='href')[0]
-    html = client.request(href, as_bytes=True)
-    html = html.decode('windows-1253')
-    link = parseDOM(html, 'iframe', ret='src')[0]
-    embed = client.request(link)
     url = re.search(r'mp3: [\'"](.+?)[\'"]', embed).group(1).replace('https', 'http')
     image = parseDOM(html, 'img', ret='src')[0]
 
     data = {'title': title, 'image': image, 'url': url}
 
+    station_store.set(href, {'item': data, 'validators': validators, 'healthy': True})
+
     return data
 
 
-@cache_function(5760)
-def district_list():
+@cache_function(5760, revalidate=True)
+def district_stations():
 
-    result = client.request(DISTRICT_LINK, as_bytes=True)
+    result = net.request(DISTRICT_LINK, as_bytes=True)
     result = result.decode('windows-1253')
     _radios = parseDOM(result, 'td')
     stations = [r for r in _radios if r]
 
-    self_list = []
+    return [{'title': parseDOM(s, 'a')[0], 'href': parseDOM(s, 'a', ret='href')[0]} for s in stations]
 
-    with concurrent_futures.ThreadPoolExecutor(5) as executor:
 
-        threads = [executor.submit(_radio_loop, station) for station in stations]
+def resolve_stations(stations):
 
-        for future in concurrent_futures.as_completed(threads):
+    """
+    Resolves stations into the station store, the ones failing keep their last good item and are flagged unhealthy
+    """
 
-            item = future.result()
+    results = Scraper().map(_radio_loop, stations)
 
-            if not item:
-                continue
+    for station, item in zip(stations, results):
+
+        if item:
+            continue
 
-            self_list.append(item)
+        entry = station_store.get(station['href'])
+        value = entry[1] if entry else {'item': None, 'validators': None}
+        value['healthy'] = False
 
-    return self_list
+        station_store.set(station['href'], value)
+
+    return results
+
+
+# one background refresh of the stations at a time, so that the rate limits of its Scraper hold
+_stations_refresh = Lock()
+
+
+def refresh_stations(stations):
+
+    """
+    Resolves stations again on a background thread, unless a refresh is running already. Under
+    store.foreground() they are resolved before returning instead.
+    """
+
+    if not _stations_refresh.acquire(False):
+        return
+
+    if in_foreground():
+        try:
+            resolve_stations(stations)
+        finally:
+            _stations_refresh.release()
+        return
+
+    def target():
+        try:
+            resolve_stations(stations)
+        except Exception:
+            pass
+        finally:
+            _stations_refresh.release()
+
+    Thread(target=target).start()
+
+
+def district_list(ttl=STATION_TTL):
+
+    """
+    Regional stations as cached one by one in the station store. Stations never seen before are resolved on the
+    spot, stale (older than ttl minutes) and unhealthy ones are listed as cached and resolved again on a
+    background thread.
+    """
+
+    stations = district_stations()
+    hrefs = [s['href'] for s in stations]
+
+    cached = station_store.get_many(hrefs)
+    fresh = station_store.get_many(hrefs, ttl * 60)
+
+    missing = [s for s in stations if s['href'] not in cached]
+
+    if missing:
+        resolve_stations(missing)
+        resolved = station_store.get_many([s['href'] for s in missing])
+        cached.update(resolved)
+        fresh.update(resolved)
+
+    stale = [s for s in stations if s['href'] not in fresh or not cached[s['href']].get('healthy')]
+
+    if stale:
+        refresh_stations(stale)
+
+    return [
+        dict(cached[s['href']]['item'], title=s['title']) for s in stations
+        if s['href'] in cached and cached[s['href']]['item']
+    ]
 
 
 @urldispatcher.register('district')
@@ -784,7 +1052,7 @@ def cached_resolve(url):
 
     codename = split(url)[1].partition('-')[2]
 
-    _json = client.request(ACQUIRE_CONTENT.format(DEVICE_KEY, codename), output='json')
+    _json = net.request(ACQUIRE_CONTENT.format(DEVICE_KEY, codename), output='json')
 
     for media in _json['MediaFiles']:
 
@@ -807,6 +1075,11 @@ def resolve(url):
 
     if url.startswith('plugin://'):
 
+        # the YouTube stack is only loaded by the few items that actually need it
+        from youtube_resolver import resolve as yt_resolver
+
+        keys_registration()
+
         vid = re.search(r'video_id=([\w-]{11})', url).group(1)
 
         streams = yt_resolver(vid)
@@ -823,6 +1096,10 @@ def resolve(url):
 
         return stream
 
+    elif 'AcquireContent' in url:
+
+        return cached_live_resolve(url)
+
     else:
 
         return cached_resolve(url)
@@ -846,4 +1123,6 @@ def play(url):
 @urldispatcher.register('enter_yt_channel', ['url'])
 def enter_yt_channel(url):
 
+    keys_registration()
+
     control.execute('Container.Update({},return)'.format(url))
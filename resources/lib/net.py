@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+
+'''
+    ERTflix Addon
+    Author Twilight0
+
+    SPDX-License-Identifier: GPL-3.0-only
+    See LICENSES/GPL-3.0-only for more information.
+'''
+
+from __future__ import absolute_import
+
+import json
+from hashlib import md5
+from os import environ, makedirs
+from os.path import exists, join
+from threading import Lock, local
+from time import time
+
+USER_AGENT = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.110 '
+    'Safari/537.36'
+)
+
+_session = None
+_lock = Lock()
+_recorder = local()
+stats = {'requests': 0, 'bytes': 0, 'seconds': 0.0}
+
+
+def session():
+
+    """
+    Session shared by every request of the process, under reuselanguageinvoker it outlives a single invocation,
+    so connections (and TLS sessions) to api.app.ertflix.gr & co. are kept alive and reused from a bounded pool
+    """
+
+    global _session
+
+    if _session is None:
+
+        with _lock:
+
+            if _session is None:
+
+                # imported on first use, routes that never go online do not pay for it
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                s = requests.Session()
+                adapter = HTTPAdapter(pool_connections=8, pool_maxsize=8)
+                s.mount('https://', adapter)
+                s.mount('http://', adapter)
+                s.headers['User-Agent'] = USER_AGENT
+
+                # requests asks for gzip & deflate by default, br only when it can decode it
+                try:
+                    import brotli  # noqa: F401 - availability probe, urllib3 imports it itself to decode
+                    s.headers['Accept-Encoding'] = 'gzip, deflate, br'
+                except ImportError:
+                    pass
+
+                _session = s
+
+    return _session
+
+
+class Fixture(object):
+
+    """
+    Stands in for a response when replaying, the body is read from a file written in record mode
+    """
+
+    status_code = 200
+    headers = {}
+
+    def __init__(self, content):
+
+        self.content = content
+
+    def raise_for_status(self):
+
+        pass
+
+    def json(self):
+
+        return json.loads(self.content.decode('utf-8'))
+
+
+def fixture(directory, url, post=None):
+
+    """
+    Path of the recorded response of a request, ERTFLIX_RECORD=<directory> writes every response received there
+    and ERTFLIX_REPLAY=<directory> serves requests from it without going online, e.g. to time routes offline
+    """
+
+    return join(directory, md5(url.encode('utf-8') + b'\n' + (post or b'')).hexdigest())
+
+
+def _text(response):
+
+    if 'charset' in response.headers.get('Content-Type', '').lower():
+        return response.text
+
+    return response.content.decode('utf-8', 'replace')
+
+
+def _fetch(url, post, headers, timeout):
+
+    if environ.get('ERTFLIX_REPLAY'):
+        with open(fixture(environ['ERTFLIX_REPLAY'], url, post), 'rb') as f:
+            return Fixture(f.read())
+    elif post is None:
+        return session().get(url, headers=headers, timeout=float(timeout))
+    else:
+        return session().post(url, data=post, headers=headers, timeout=float(timeout))
+
+
+def request(url, post=None, output='', as_bytes=False, headers=None, timeout=30):
+
+    """
+    Drop-in for the subset of tulip's client.request used by the addon, GET unless post is given
+    """
+
+    started = time()
+
+    if post is not None and not isinstance(post, bytes):
+        post = post.encode('utf-8')
+
+    # the body of a conditional request that found the page changed, already downloaded & counted by modified()
+    response = _responses().pop(url, None) if post is None and not headers else None
+    reused = response is not None
+
+    if not reused:
+        response = _fetch(url, post, headers, timeout)
+
+    response.raise_for_status()
+
+    if environ.get('ERTFLIX_RECORD'):
+        if not exists(environ['ERTFLIX_RECORD']):
+            makedirs(environ['ERTFLIX_RECORD'])
+        with open(fixture(environ['ERTFLIX_RECORD'], url, post), 'wb') as f:
+            f.write(response.content)
+
+    if not reused:
+        _count(response, started)
+
+    validators = getattr(_recorder, 'validators', None)
+
+    if validators is not None:
+        if post is None:
+            validators.append([url, response.headers.get('ETag'), response.headers.get('Last-Modified')])
+        else:
+            validators.append([url, None, None])
+
+    if output == 'json':
+        return response.json()
+    elif as_bytes:
+        return response.content
+    else:
+        return _text(response)
+
+
+def _count(response, started):
+
+    stats['requests'] += 1
+    stats['bytes'] += len(response.content)
+    stats['seconds'] += time() - started
+
+
+def _responses():
+
+    """
+    Responses of changed pages modified() received on the current thread, by url, for request() to reuse
+    """
+
+    if getattr(_recorder, 'responses', None) is None:
+        _recorder.responses = {}
+
+    return _recorder.responses
+
+
+def record():
+
+    """
+    Starts collecting the validators (ETag, Last-Modified) of the responses received on the current thread
+    """
+
+    _recorder.validators = []
+
+
+def recorded():
+
+    validators = getattr(_recorder, 'validators', None)
+    _recorder.validators = None
+    # bodies the refresh did not ask for again are of no further use
+    _recorder.responses = None
+
+    return validators
+
+
+def unchanged(validators, check=None):
+
+    """
+    True when every page in validators ([url, etag, last modified], ...) answers 304 to a conditional request,
+    made by check(url, etag, last modified) when given (e.g. to limit them), modified() otherwise
+    """
+
+    if not validators or not all(v[1] or v[2] for v in validators):
+        return False
+
+    try:
+        for v in validators:
+            if (check or modified)(*v):
+                return False
+    except Exception:
+        return False
+
+    return True
+
+
+def modified(url, etag=None, last_modified=None, timeout=30):
+
+    """
+    Conditional GET, False only when the server answers 304 Not Modified. The body of any other answer is kept,
+    so the next request() of url on the same thread (the refresh of the page) is served from it rather than
+    downloading the page a second time.
+    """
+
+    if environ.get('ERTFLIX_REPLAY'):
+        return True
+
+    started = time()
+    headers = {}
+
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+
+    # read in full, so the connection goes back to the pool
+    response = session().get(url, headers=headers, timeout=float(timeout))
+
+    _count(response, started)
+
+    if response.status_code == 304:
+        return False
+
+    if response.status_code == 200:
+        _responses()[url] = response
+
+    return True
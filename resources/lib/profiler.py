@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+'''
+    ERTflix Addon
+    Author Twilight0
+
+    SPDX-License-Identifier: GPL-3.0-only
+    See LICENSES/GPL-3.0-only for more information.
+'''
+
+from __future__ import absolute_import
+
+import sqlite3
+from contextlib import contextmanager
+from os import makedirs
+from os.path import exists, join
+from time import time
+from tulip import control
+from tulip.url_dispatcher import urldispatcher
+from . import net
+from .memcache import MemoryCache
+from .store import Store
+
+timings = {'parse': 0.0}
+
+# rows kept in the profile table, older ones are dropped
+ROWS = 1000
+
+
+def enabled():
+
+    return control.setting('profiling') == 'true'
+
+
+@contextmanager
+def measure(name):
+
+    """
+    Adds the time spent in the block to timings[name], cheap enough to stay on when profiling is off
+    """
+
+    start = time()
+
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time() - start
+
+
+def _connect():
+
+    if not exists(control.dataPath):
+        makedirs(control.dataPath)
+
+    dbcon = sqlite3.connect(join(control.dataPath, 'profile.db'), timeout=10)
+    dbcon.execute(
+        'CREATE TABLE IF NOT EXISTS profile (started REAL, action TEXT, wall REAL, requests INTEGER, bytes INTEGER, '
+        'network REAL, parse REAL, memory_hits INTEGER, memory_misses INTEGER, store_hits INTEGER, '
+        'store_misses INTEGER)'
+    )
+
+    return dbcon
+
+
+def _snapshot():
+
+    # each cached lookup is counted once, under the tier that answered it: memory, disk (the store or tulip's
+    # cache) or neither, when the function ran. Network figures are process wide, they include background work.
+    return [
+        net.stats['requests'], net.stats['bytes'], net.stats['seconds'], timings['parse'],
+        MemoryCache.counters['hits'], MemoryCache.counters['misses'],
+        Store.counters['fresh'] + Store.counters['stale'] + MemoryCache.counters['disk_hits'], Store.counters['miss']
+    ]
+
+
+@contextmanager
+def profile(action):
+
+    """
+    Records wall time, requests, bytes downloaded, network & parse time and cache hits/misses of a route. Requests,
+    bytes and network time are those of the whole process while the route runs, background threads included.
+    """
+
+    if not enabled():
+        yield
+        return
+
+    started = time()
+    before = _snapshot()
+
+    try:
+        yield
+    finally:
+
+        wall = time() - started
+        delta = [a - b for a, b in zip(_snapshot(), before)]
+
+        try:
+            with _connect() as dbcon:
+                dbcon.execute(
+                    'INSERT INTO profile VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', [started, action, wall] + delta
+                )
+                dbcon.execute(
+                    'DELETE FROM profile WHERE rowid <= (SELECT MAX(rowid) FROM profile) - ?', (ROWS,)
+                )
+        except Exception:
+            pass
+
+
+@urldispatcher.register('profile_summary')
+def profile_summary():
+
+    with _connect() as dbcon:
+        rows = dbcon.execute(
+            'SELECT action, COUNT(*), AVG(wall), MAX(wall), AVG(requests), AVG(bytes), AVG(network), AVG(parse), '
+            'SUM(memory_hits + store_hits), SUM(memory_misses + store_misses) FROM profile GROUP BY action '
+            'ORDER BY AVG(wall) DESC'
+        ).fetchall()
+
+    lines = []
+
+    for action, count, wall, slowest, requests, bytes_, network, parse, hits, misses in rows:
+        lines.append(
+            '[B]{0}[/B] x{1}: {2:.2f}s avg, {3:.2f}s max | {4:.1f} requests, {5:.0f} KB, network {6:.2f}s, '
+            'parse {7:.2f}s | cache {8}/{9} hits'.format(
+                action, count, wall, slowest, requests, bytes_ / 1024, network, parse, hits, hits + misses
+            )
+        )
+
+    if lines:
+        lines.extend(['', control.lang(30074)])
+
+    control.dialog.textviewer(heading=control.lang(30073), text='\n'.join(lines) or control.lang(30071))
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+'''
+    ERTflix Addon
+    Author Twilight0
+
+    SPDX-License-Identifier: GPL-3.0-only
+    See LICENSES/GPL-3.0-only for more information.
+'''
+
+from __future__ import absolute_import
+
+from threading import BoundedSemaphore, Condition, Lock
+from time import sleep
+from tulip.compat import concurrent_futures, urlparse
+from . import net
+
+
+class Scraper(object):
+
+    """
+    Runs a scraping function over many items (eg. radio stations). Results come back in the order of the items,
+    an item failing after its retries yields None instead of failing the rest. Concurrency adapts between 1 and
+    workers: it grows by one on every success and halves on every failure. At most connections requests to the
+    same host are open at a time.
+    """
+
+    def __init__(self, workers=8, connections=4, retries=2, backoff=1.0):
+
+        self.workers = workers
+        self.limit = max(1, workers // 2)
+        self.connections = connections
+        self.retries = retries
+        self.backoff = backoff
+        self._active = 0
+        self._condition = Condition()
+        self._hosts = {}
+        self._hosts_lock = Lock()
+
+    def host(self, url):
+
+        """
+        Semaphore bounding the requests open to the host of url
+        """
+
+        netloc = urlparse(url).netloc
+
+        with self._hosts_lock:
+            return self._hosts.setdefault(netloc, BoundedSemaphore(self.connections))
+
+    def fetch(self, url, **kwargs):
+
+        with self.host(url):
+            return net.request(url, **kwargs)
+
+    def modified(self, url, *args, **kwargs):
+
+        with self.host(url):
+            return net.modified(url, *args, **kwargs)
+
+    def unchanged(self, validators):
+
+        """
+        Same as net.unchanged, within the per host limit
+        """
+
+        return net.unchanged(validators, self.modified)
+
+    def _acquire(self):
+
+        with self._condition:
+            while self._active >= self.limit:
+                self._condition.wait()
+            self._active += 1
+
+    def _release(self, success):
+
+        with self._condition:
+            self._active -= 1
+            if success:
+                self.limit = min(self.workers, self.limit + 1)
+            else:
+                self.limit = max(1, self.limit // 2)
+            self._condition.notify_all()
+
+    def _call(self, func, item):
+
+        for attempt in range(self.retries + 1):
+
+            self._acquire()
+            success = False
+
+            try:
+                result = func(item, self)
+                success = True
+                return result
+            except Exception:
+                if attempt == self.retries:
+                    return
+            finally:
+                self._release(success)
+
+            sleep(self.backoff * 2 ** attempt)
+
+    def map(self, func, items):
+
+        """
+        Returns [func(item, self) for item in items], calls running concurrently
+        """
+
+        with concurrent_futures.ThreadPoolExecutor(self.workers) as executor:
+            return list(executor.map(lambda item: self._call(func, item), items))
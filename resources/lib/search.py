@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+'''
+    ERTflix Addon
+    Author Twilight0
+
+    SPDX-License-Identifier: GPL-3.0-only
+    See LICENSES/GPL-3.0-only for more information.
+'''
+
+from __future__ import absolute_import
+
+import re
+from unicodedata import combining, normalize as unicode_normalize
+from .store import Store
+
+WORD = re.compile(r'\w+', re.UNICODE)
+
+
+def normalize(text):
+
+    """
+    Lower case, accents stripped and final sigma folded, so that 'Ειδήσεις', 'ΕΙΔΗΣΕΙΣ' and 'ειδησεις' are equal
+    """
+
+    text = unicode_normalize('NFD', text)
+    text = u''.join(c for c in text if not combining(c))
+
+    return text.lower().replace(u'ς', u'σ')
+
+
+def tokens(text):
+
+    return set(WORD.findall(normalize(text)))
+
+
+class SearchIndex(Store):
+
+    """
+    Inverted index over everything the addon has fetched so far, documents are stored ready to be listed
+    under their key and every token of their text points back to that key
+    """
+
+    def __init__(self, file_=None, table='docs'):
+
+        super(SearchIndex, self).__init__(file_, table)
+
+    def _create(self, dbcon):
+
+        super(SearchIndex, self)._create(dbcon)
+
+        dbcon.execute('CREATE TABLE IF NOT EXISTS terms (token TEXT, key TEXT, PRIMARY KEY (token, key))')
+
+    def add(self, documents):
+
+        """
+        documents is an iterable of (key, text, document), previous tokens of the same keys are replaced
+        """
+
+        documents = list(documents)
+
+        if not documents:
+            return
+
+        self.set_many((key, document) for key, _, document in documents)
+
+        with self._connect() as dbcon:
+            dbcon.executemany('DELETE FROM terms WHERE key = ?', [(key,) for key, _, _ in documents])
+            dbcon.executemany(
+                'INSERT OR IGNORE INTO terms VALUES (?, ?)',
+                [(token, key) for key, text, _ in documents for token in tokens(text)]
+            )
+
+    def remove(self, keys):
+
+        keys = list(keys)
+
+        self.delete_many(keys)
+
+        with self._connect() as dbcon:
+            dbcon.executemany('DELETE FROM terms WHERE key = ?', [(key,) for key in keys])
+
+    def prune(self, max_age, prefix=''):
+
+        super(SearchIndex, self).prune(max_age, prefix)
+
+        with self._connect() as dbcon:
+            dbcon.execute('DELETE FROM terms WHERE key NOT IN (SELECT key FROM {0})'.format(self.table))
+
+    def search(self, query, limit=200):
+
+        """
+        Documents containing every word of query, words of the query also match as prefixes
+        """
+
+        words = tokens(query)
+
+        if not words:
+            return []
+
+        keys = None
+
+        with self._connect() as dbcon:
+
+            for word in words:
+
+                found = set(
+                    row[0] for row in dbcon.execute(
+                        'SELECT key FROM terms WHERE token >= ? AND token < ?', (word, word + u'\uffff')
+                    )
+                )
+
+                keys = found if keys is None else keys & found
+
+                if not keys:
+                    return []
+
+        documents = list(self.get_many(sorted(keys)[:limit]).values())
+        documents.sort(key=lambda d: normalize(d['item']['title']))
+
+        return documents
+
+    def clear(self):
+
+        super(SearchIndex, self).clear()
+
+        with self._connect() as dbcon:
+            dbcon.execute('DELETE FROM terms')
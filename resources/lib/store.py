@@ -0,0 +1,358 @@
+# -*- coding: utf-8 -*-
+
+'''
+    ERTflix Addon
+    Author Twilight0
+
+    SPDX-License-Identifier: GPL-3.0-only
+    See LICENSES/GPL-3.0-only for more information.
+'''
+
+from __future__ import absolute_import
+
+import json, sqlite3
+from contextlib import contextmanager
+from zlib import compress, decompress
+from functools import wraps
+from os import makedirs
+from os.path import exists, join
+from threading import Lock, Thread, local
+from time import time
+from tulip import control
+from . import net
+from .memcache import _copy
+
+
+def _pack(value):
+
+    """
+    Lists of dicts (listings, tile images) are stored as one shared key table plus rows of key index/value pairs
+    """
+
+    if isinstance(value, dict):
+        return dict((k, _pack(v)) for k, v in value.items())
+    elif isinstance(value, list) and value and all(isinstance(i, dict) for i in value):
+        keys = {}
+        rows = [[x for k, v in i.items() for x in (keys.setdefault(k, len(keys)), v)] for i in value]
+        return {'__keys__': sorted(keys, key=keys.get), '__rows__': rows}
+    else:
+        return value
+
+
+def _unpack(value):
+
+    if isinstance(value, dict):
+        if '__rows__' in value:
+            keys = value['__keys__']
+            return [dict(zip([keys[k] for k in r[::2]], r[1::2])) for r in value['__rows__']]
+        return dict((k, _unpack(v)) for k, v in value.items())
+    else:
+        return value
+
+
+def dumps(value):
+
+    return sqlite3.Binary(compress(json.dumps(_pack(value), separators=(',', ':')).encode('utf-8')))
+
+
+def loads(data):
+
+    # entries written before values were compressed are plain json text
+    if isinstance(data, type(u'')):
+        return json.loads(data)
+
+    return _unpack(json.loads(decompress(bytes(data)).decode('utf-8')))
+
+
+def cache_key(func, args=(), kwargs=None):
+
+    return repr((func.__module__, func.__name__, tuple(args), sorted((kwargs or {}).items())))
+
+
+_thread = local()
+
+
+@contextmanager
+def foreground():
+
+    """
+    Within the block, stale entries are refreshed on the calling thread before they are returned instead of in
+    the background, so the caller knows the work (and its downloads) is over when a cached function returns
+    """
+
+    _thread.foreground = True
+
+    try:
+        yield
+    finally:
+        _thread.foreground = False
+
+
+def in_foreground():
+
+    return getattr(_thread, 'foreground', False)
+
+
+class Store(object):
+
+    """
+    Small key/value store on top of sqlite, unlike tulip's function cache it keeps the time each entry was
+    written, so callers can decide for themselves whether an entry is fresh, stale or unusable.
+    """
+
+    # outcomes of cache_function lookups, for the profiler
+    counters = {'fresh': 0, 'stale': 0, 'miss': 0}
+
+    def __init__(self, file_=None, table='store'):
+
+        if not file_:
+            if not exists(control.dataPath):
+                makedirs(control.dataPath)
+            file_ = join(control.dataPath, 'store.db')
+
+        self.file_ = file_
+        self.table = table
+        self._created = False
+        self._refreshing = set()
+        self._lock = Lock()
+
+    def _create(self, dbcon):
+
+        dbcon.execute(
+            'CREATE TABLE IF NOT EXISTS {0} (key TEXT PRIMARY KEY, fetched REAL, value TEXT)'.format(self.table)
+        )
+
+    def _connect(self):
+
+        dbcon = sqlite3.connect(self.file_, timeout=10)
+
+        # tables are created on first use rather than on import
+        if not self._created:
+            with dbcon:
+                self._create(dbcon)
+            self._created = True
+
+        return dbcon
+
+    def get(self, key):
+
+        with self._connect() as dbcon:
+            row = dbcon.execute('SELECT fetched, value FROM {0} WHERE key = ?'.format(self.table), (key,)).fetchone()
+
+        if not row:
+            return
+
+        return row[0], loads(row[1])
+
+    def get_many(self, keys, max_age=None):
+
+        """
+        Returns a dict of the values found for keys, leaving out entries older than max_age seconds
+        """
+
+        result = {}
+        keys = list(keys)
+        oldest = time() - max_age if max_age else 0
+
+        with self._connect() as dbcon:
+
+            # sqlite allows up to 999 host parameters per statement
+            for i in range(0, len(keys), 900):
+
+                chunk = keys[i:i + 900]
+                rows = dbcon.execute(
+                    'SELECT key, value FROM {0} WHERE fetched > ? AND key IN ({1})'.format(
+                        self.table, ','.join('?' * len(chunk))
+                    ), [oldest] + chunk
+                )
+
+                for key, value in rows:
+                    result[key] = loads(value)
+
+        return result
+
+    def prune(self, max_age, prefix=''):
+
+        """
+        Deletes the entries older than max_age seconds, of the keys starting with prefix when given
+        """
+
+        with self._connect() as dbcon:
+            dbcon.execute(
+                'DELETE FROM {0} WHERE fetched < ? AND substr(key, 1, ?) = ?'.format(self.table),
+                (time() - max_age, len(prefix), prefix)
+            )
+
+    def trim(self, limit):
+
+        """
+        Deletes all but the limit most recently written entries
+        """
+
+        with self._connect() as dbcon:
+            dbcon.execute(
+                'DELETE FROM {0} WHERE key NOT IN (SELECT key FROM {0} ORDER BY fetched DESC LIMIT ?)'.format(
+                    self.table
+                ), (limit,)
+            )
+
+    def latest(self, limit=20):
+
+        """
+        Values of the most recently written entries, newest first
+        """
+
+        with self._connect() as dbcon:
+            rows = dbcon.execute(
+                'SELECT value FROM {0} ORDER BY fetched DESC LIMIT ?'.format(self.table), (limit,)
+            ).fetchall()
+
+        return [loads(row[0]) for row in rows]
+
+    def set_many(self, items):
+
+        fetched = time()
+
+        with self._connect() as dbcon:
+            dbcon.executemany(
+                'INSERT OR REPLACE INTO {0} VALUES (?, ?, ?)'.format(self.table),
+                [(key, fetched, dumps(value)) for key, value in items]
+            )
+
+    def set(self, key, value, fetched=None):
+
+        fetched = fetched or time()
+
+        with self._connect() as dbcon:
+            dbcon.execute(
+                'INSERT OR REPLACE INTO {0} VALUES (?, ?, ?)'.format(self.table), (key, fetched, dumps(value))
+            )
+
+        return fetched, value
+
+    def delete(self, key):
+
+        with self._connect() as dbcon:
+            dbcon.execute('DELETE FROM {0} WHERE key = ?'.format(self.table), (key,))
+
+    def delete_many(self, keys):
+
+        with self._connect() as dbcon:
+            dbcon.executemany('DELETE FROM {0} WHERE key = ?'.format(self.table), [(key,) for key in keys])
+
+    def items(self):
+
+        with self._connect() as dbcon:
+            rows = dbcon.execute('SELECT key, value FROM {0}'.format(self.table)).fetchall()
+
+        return dict((key, loads(value)) for key, value in rows)
+
+    def clear(self):
+
+        with self._connect() as dbcon:
+            dbcon.execute('DELETE FROM {0}'.format(self.table))
+
+    def _refresh(self, key, func, args, kwargs, memory=None, ttl=0, entry=None):
+
+        try:
+
+            if entry and net.unchanged(entry[1]['validators']):
+
+                # nothing changed upstream, the parsed value is kept and only its age is reset
+                value = entry[1]
+
+            else:
+
+                net.record()
+
+                try:
+                    result = func(*args, **kwargs)
+                finally:
+                    validators = net.recorded()
+
+                value = {'value': result, 'validators': validators}
+
+            if value['value']:
+                new = self.set(key, value)
+                if memory is not None:
+                    memory.set(key, new, ttl)
+
+            return value['value']
+
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _refresh_in_background(self, key, func, args, kwargs, memory=None, ttl=0, entry=None):
+
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def target():
+            try:
+                self._refresh(key, func, args, kwargs, memory, ttl, entry)
+            except Exception:
+                # keep serving the stale entry, the next call will try again
+                pass
+
+        Thread(target=target).start()
+
+    def cache_function(self, duration, max_stale, memory=None):
+
+        """
+        Stale-while-revalidate caching. Entries younger than duration (minutes) are returned as they are,
+        entries up to max_stale() minutes past that are returned immediately while being refreshed on a
+        background thread and anything older blocks on a fresh fetch. Under foreground() stale entries block
+        too. Refreshes first revalidate the pages an entry was built from with conditional requests and keep
+        the entry when none of them changed.
+        """
+
+        def decorator(func):
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+
+                key = cache_key(func, args, kwargs)
+                stale = max_stale() * 60
+                ttl = duration * 60 + stale
+
+                # the lookup is counted once, by the tier answering it
+                entry, hit = memory.get(key, count=False) if memory is not None else (None, False)
+
+                if not hit:
+                    entry = self.get(key)
+
+                if entry and isinstance(entry[1], dict):
+
+                    age = time() - entry[0]
+
+                    if hit and age < ttl:
+                        memory.count('hits')
+                    elif age < ttl:
+                        Store.counters['fresh' if age < duration * 60 else 'stale'] += 1
+                        if memory is not None:
+                            memory.set(key, entry, ttl - age)
+
+                    if age < duration * 60:
+                        return _copy(entry[1]['value'])
+                    elif age < ttl and not in_foreground():
+                        self._refresh_in_background(key, func, args, kwargs, memory, ttl, entry)
+                        return _copy(entry[1]['value'])
+                    elif age >= ttl:
+                        Store.counters['miss'] += 1
+
+                else:
+
+                    entry = None
+                    Store.counters['miss'] += 1
+
+                with self._lock:
+                    self._refreshing.add(key)
+
+                return _copy(self._refresh(key, func, args, kwargs, memory, ttl, entry))
+
+            return wrapper
+
+        return decorator
@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+
+'''
+    ERTflix Addon
+    Author Twilight0
+
+    SPDX-License-Identifier: GPL-3.0-only
+    See LICENSES/GPL-3.0-only for more information.
+'''
+
+from __future__ import absolute_import
+
+from time import sleep
+from tulip import client, control
+from tulip.compat import concurrent_futures
+from . import net
+from .constants import VOD_LINK, GET_SERIES_DETAILS, GET_TILES, TILE_TTL
+from .utils import tiles_post, tile_store, search_index
+
+
+class IncompleteTiles(Exception):
+
+    """
+    Raised when chunks of a GetTiles call still failed after their retries, tiles holds the ones fetched
+    """
+
+    def __init__(self, error, tiles):
+
+        super(IncompleteTiles, self).__init__(error)
+        self.tiles = tiles
+
+
+def _get_chunk(chunk, retries):
+
+    for attempt in range(retries + 1):
+
+        try:
+            return net.request(GET_TILES, post=tiles_post(chunk), output='json')['tiles']
+        except Exception:
+            if attempt == retries:
+                raise
+            sleep(0.5 * (attempt + 1))
+
+
+def get_tiles(requested, duration=TILE_TTL, **kwargs):
+
+    """
+    Returns the requested tiles ([{'id': ...}, ...]) in the requested order. Tiles are cached individually by id
+    for duration minutes, so GetTiles is only asked for the ids that are not cached already. Raises
+    IncompleteTiles rather than returning a partial list, which callers would cache.
+    """
+
+    ids = [r['id'] for r in requested]
+
+    tiles = tile_store.get_many(set(ids), duration * 60)
+
+    seen = set(tiles)
+    missing = []
+
+    for i in ids:
+        if i not in seen:
+            seen.add(i)
+            missing.append({'id': i})
+
+    if missing:
+
+        try:
+            fetched = fetch_tiles(missing, **kwargs)
+        except IncompleteTiles as e:
+            # the chunks that did arrive are kept, the next attempt only asks for the rest
+            _keep(e.tiles)
+            raise
+
+        _keep(fetched)
+        tiles.update((t['id'], t) for t in fetched)
+
+    return [tiles[i] for i in ids if i in tiles]
+
+
+def _keep(fetched):
+
+    tile_store.set_many((t['id'], t) for t in fetched)
+    index_tiles(fetched)
+
+
+def fetch_tiles(requested, chunk=50, workers=4, retries=1):
+
+    """
+    Fetches the requested tiles through GetTiles in chunks, requested concurrently and merged back in the
+    original order. When a chunk still fails after its retries IncompleteTiles is raised, with the tiles of
+    the other chunks.
+    """
+
+    chunks = [requested[i:i + chunk] for i in range(0, len(requested), chunk)]
+
+    if len(chunks) <= 1:
+        return _get_chunk(requested, retries)
+
+    results = [None] * len(chunks)
+    error = None
+
+    with concurrent_futures.ThreadPoolExecutor(min(workers, len(chunks))) as executor:
+
+        threads = dict((executor.submit(_get_chunk, c, retries), n) for n, c in enumerate(chunks))
+
+        for future in concurrent_futures.as_completed(threads):
+
+            try:
+                results[threads[future]] = future.result()
+            except Exception as e:
+                error = e
+
+    tiles_list = []
+
+    for r in results:
+        if r:
+            tiles_list.extend(r)
+
+    if error:
+        raise IncompleteTiles(error, tiles_list)
+
+    return tiles_list
+
+
+def index_tiles(tiles):
+
+    """
+    Adds tiles to the local search index, listed the same way recursive_list_items lists them
+    """
+
+    labels_ = labels()
+
+    try:
+        search_index.add(
+            (
+                'tile:' + t['id'],
+                ' '.join([t['title'], t.get('subtitle') or '', t.get('shortDescription') or '']),
+                {'item': tile_item(t, labels_), 'restricted': t['isRegionRestrictionEnabled']}
+            ) for t in tiles
+        )
+    except Exception:
+        # the index is a convenience, it must never break a listing
+        pass
+
+
+def labels():
+
+    """
+    Localized strings and defaults used for every tile, to be looked up once per listing
+    """
+
+    return {
+        'season': control.lang(30063), 'episode': control.lang(30064), 'plot': control.lang(30014),
+        'fanart': control.fanart()
+    }
+
+
+def _pick(urls):
+
+    return urls[1] if len(urls) > 1 else urls[0]
+
+
+def artwork(images, default_fanart):
+
+    """
+    Returns image & fanart of a tile, images are indexed by role in a single pass over the list
+    """
+
+    if len(images) == 1:
+        return images[0]['url'], default_fanart
+
+    main = []
+    roles = {}
+    backgrounds = []
+
+    for i in images:
+
+        url = i['url']
+
+        if i['isMain']:
+            main.append(url)
+
+        roles.setdefault(i['role'], []).append(url)
+
+        if i['role'] == 'photo' and 'ertflix-background' in url:
+            backgrounds.append(url)
+
+    image = images[0]['url']
+
+    for urls in [main, roles.get('hbbtv-icon'), roles.get('photo'), roles.get('hbbtv-background')]:
+        if urls:
+            image = urls[0]
+            break
+
+    fanart = default_fanart
+
+    for urls in [roles.get('photo-details'), roles.get('hbbtv-background'), backgrounds]:
+        if urls:
+            fanart = _pick(urls)
+            break
+
+    return image, fanart
+
+
+def _episode_label(tile, labels_):
+
+    try:
+        season = ' '.join([labels_['season'], str(tile['season']['seasonNumber'])])
+    except KeyError:
+        season = None
+
+    if not season:
+        return ' '.join([labels_['episode'], str(tile['episodeNumber'])])
+
+    try:
+        return ''.join([season, ', ', labels_['episode'], ' ', str(tile['episodeNumber'])])
+    except KeyError:
+        return '/'.join(tile['publishDate'].partition('T')[0].split('-')[::-1])
+
+
+def tile_item(tile, labels_):
+
+    """
+    Maps a tile of a GetTiles response to a directory item, labels_ is the result of labels()
+    """
+
+    title = tile['title']
+
+    if 'subtitle' in tile:
+        title = ' - '.join([title, tile['subtitle']])
+
+    if tile.get('isEpisode'):
+        try:
+            title = '[CR]'.join([title, _episode_label(tile, labels_)])
+        except Exception:
+            pass
+
+    image, fanart = artwork(tile['images'], labels_['fanart'])
+
+    plot = labels_['plot']
+
+    for p in [
+        tile.get('description'), tile.get('shortDescription'), tile.get('tinyDescription'), tile.get('subtitle'),
+        tile.get('subTitle')
+    ]:
+        if p:
+            plot = client.replaceHTMLCodes(client.stripTags(p))
+            break
+
+    year = tile.get('year')
+
+    if not year:
+        try:
+            year = int(tile.get('productionYears')[:4])
+        except Exception:
+            year = 2021
+
+    playable = tile.get('hasPlayableStream') and not tile.get('type') == 'ser'
+
+    if playable:
+        url = VOD_LINK.format('-'.join([tile['id'], tile['codename']]))
+    else:
+        url = GET_SERIES_DETAILS.format(tile['id'])
+
+    data = {'title': title, 'image': image, 'fanart': fanart, 'url': url, 'plot': plot, 'year': year}
+
+    if tile.get('durationSeconds'):
+        data['duration'] = tile['durationSeconds']
+
+    if playable:
+        data.update({'action': 'play', 'isFolder': 'False'})
+    else:
+        data['action'] = 'listing'
+
+    return data
@@ -10,21 +10,113 @@
 
 from __future__ import absolute_import
 
-import json
+import json, re
 from base64 import b64decode
+from threading import BoundedSemaphore, Event, Lock, Thread
+from time import time
 from zlib import decompress
-from .constants import SCRAMBLE, GET_REGIONS
+from . import net
+from .constants import SCRAMBLE, GET_REGIONS, TILE_TTL, SEARCH_TTL, SEARCH_INDEX_TTL, RECENT_SEARCHES
+from .memcache import MemoryCache
+from .store import Store, cache_key
+from .search import SearchIndex
+from .profiler import measure
 from tulip.control import openSettings, quit_kodi
 from tulip.url_dispatcher import urldispatcher
-from tulip import bookmarks, cache, control, client
-from youtube_registration import register_api_keys
+from tulip import bookmarks, cache, control
 
 
-cache_function = cache.FunctionCache().cache_function
+memory_cache = MemoryCache()
+store = Store()
+tile_store = Store(table='tiles')
+index_store = Store(table='idx')
+search_index = SearchIndex()
+recent_store = Store(table='recent')
+station_store = Store(table='stations')
+
+
+def forget(func, *args):
+
+    """
+    Drops the cached result of func(*args) from both the memory and the store tier
+    """
+
+    key = cache_key(func, args)
+
+    memory_cache.delete(key)
+    store.delete(key)
+
+
+def prune_stores():
+
+    """
+    Deletes what the stores of tiles & searches would no longer return, reads only skip expired entries, so
+    without this they grow with everything ever browsed. Documents of the A-Z index are kept, they follow the
+    index itself.
+    """
+
+    tile_store.prune(TILE_TTL * 60)
+    store.prune(SEARCH_TTL * 60, 'search:')
+    search_index.prune(SEARCH_INDEX_TTL * 60, 'tile:')
+    recent_store.trim(RECENT_SEARCHES)
+
+
+def max_stale():
+    return int(control.setting('max_stale') or 0) * 60
+
+
+def cache_function(duration, revalidate=False):
+
+    if revalidate:
+        return store.cache_function(duration, max_stale, memory_cache)
+
+    return memory_cache.cache_function(duration, cache.FunctionCache().cache_function)
+
+
+_prefetch = {'cancelled': Event()}
+_prefetch_slots = BoundedSemaphore(2)
+
+
+def prefetch(func, *args):
+
+    """
+    Warms the cache of func(*args) on a background thread once the current directory is on screen. At most two
+    prefetches run at a time (extra ones are skipped) and ones not started yet are dropped by cancel_prefetch().
+    """
+
+    if control.setting('prefetch') != 'true' or not _prefetch_slots.acquire(False):
+        return
+
+    cancelled = _prefetch['cancelled']
+
+    def target():
+        try:
+            # give Kodi a moment to build the directory first
+            if not cancelled.wait(0.5):
+                func(*args)
+        except Exception:
+            pass
+        finally:
+            _prefetch_slots.release()
+
+    Thread(target=target).start()
+
+
+def cancel_prefetch():
+
+    _prefetch['cancelled'].set()
+    _prefetch['cancelled'] = Event()
 
 
 @urldispatcher.register('clear_cache')
 def clear_cache():
+    memory_cache.clear()
+    store.clear()
+    tile_store.clear()
+    index_store.clear()
+    search_index.clear()
+    recent_store.clear()
+    station_store.clear()
     cache.FunctionCache().reset_cache(notify=True)
 
 
@@ -58,14 +150,49 @@ def clear_bookmarks():
 
 def keys_registration():
 
+    """
+    Registers the addon's API keys with the YouTube addon, once per installed version of this addon
+    """
+
+    version = control.addonInfo('version')
+    entry = store.get('keys_registration')
+
+    if entry and entry[1] == version:
+        return
+
     setting = control.addon('plugin.video.youtube').getSetting('youtube.allow.dev.keys') == 'true'
 
     if setting:
 
+        from youtube_registration import register_api_keys
+
         keys = json.loads(decompress(b64decode(SCRAMBLE)))
 
         register_api_keys(control.addonInfo('id'), keys['api_key'], keys['id'], keys['secret'])
 
+        store.set('keys_registration', version)
+
+
+INITIAL_STATE = re.compile(r'var\s+_*INITIAL_STATE_*\s*=\s*')
+decoder = json.JSONDecoder()
+
+
+def initial_state(html):
+
+    """
+    Decodes the INITIAL_STATE object embedded in ertflix pages straight from the html, the document is scanned
+    once for the assignment and the object is decoded in place, there is no DOM pass and no copy of the script
+    """
+
+    with measure('parse'):
+
+        match = INITIAL_STATE.search(html)
+
+        if not match:
+            raise ValueError('INITIAL_STATE not found')
+
+        return decoder.raw_decode(html, match.end())[0]
+
 
 def collection_post(collection, page=None, limit=48):
 
@@ -108,7 +235,7 @@ def search_post(query):
 @cache_function(11520)
 def get_regions():
 
-    _json = client.request(GET_REGIONS, output='json')
+    _json = net.request(GET_REGIONS, output='json')
 
     regions = _json['regions']
 
@@ -120,7 +247,73 @@ def get_regions():
 @cache_function(11520)
 def geo_detect():
 
-    _json = client.request('https://geoip.siliconweb.com/geo.json', output='json')
+    _json = net.request('https://geoip.siliconweb.com/geo.json', output='json')
 
     if 'GR' in _json['country']:
         return True
+
+
+_region = {}
+_region_lock = Lock()
+
+
+def _detect_region():
+
+    regions = []
+
+    try:
+        regions = get_regions()
+    except Exception:
+        pass
+
+    try:
+        allowed = bool(regions) or bool(geo_detect())
+    except Exception:
+        # try again on the next listing
+        _region.pop('detecting', None)
+        return
+
+    store.set('region', [allowed, regions])
+    _region.update({'allowed': allowed, 'regions': set(regions)})
+
+
+def region_allowed():
+
+    """
+    Whether region restricted content is available to the user. The answer is kept in process and in the store,
+    when neither has it yet detection runs on a background thread and content is assumed available meanwhile,
+    so no listing ever waits on the geolocation requests.
+    """
+
+    if 'allowed' in _region:
+        return _region['allowed']
+
+    with _region_lock:
+
+        if _region.get('detecting'):
+            return True
+
+        entry = store.get('region')
+
+        if entry and time() - entry[0] < 11520 * 60:
+            _region.update({'allowed': entry[1][0], 'regions': set(entry[1][1])})
+            return _region['allowed']
+
+        _region['detecting'] = True
+
+    Thread(target=_detect_region).start()
+
+    return True
+
+
+def region_filter(items):
+
+    """
+    Drops the items of region restricted content when the user is not allowed to watch it. Listings are cached
+    with every item flagged ('restricted'), so filtering on the way out follows the answer of region_allowed()
+    even for listings built while detection was still running. The flag is taken off the items kept.
+    """
+
+    allowed = region_allowed()
+
+    return [i for i in items if not i.pop('restricted', False) or allowed]
@@ -15,7 +15,12 @@ from tulip.compat import parse_qsl
 from tulip.control import infoLabel
 from tulip.url_dispatcher import urldispatcher
 # noinspection PyProtectedMember, PyUnresolvedReferences
-from resources.lib import navigator, utils
+from resources.lib import utils, profiler
+
+# actions registered by utils & profiler, any other action is registered by navigator
+UTILS_ACTIONS = [
+    'clear_cache', 'settings', 'exit_kodi', 'addBookmark', 'deleteBookmark', 'clear_bookmarks', 'profile_summary'
+]
 
 
 def main(argv=None):
@@ -26,10 +31,16 @@ def main(argv=None):
     action = params.get('action', 'root')
     if 'audio' in infoLabel('Container.FolderPath') and action in [None, 'root']:
         action = 'radios'
-    urldispatcher.dispatch(action, params)
+    utils.cancel_prefetch()
+
+    if action not in UTILS_ACTIONS:
+        # noinspection PyUnresolvedReferences
+        from resources.lib import navigator
+
+    with profiler.profile(action):
+        urldispatcher.dispatch(action, params)
 
 
 if __name__ == '__main__':
 
-    utils.keys_registration()
     sys.exit(main())
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+'''
+    ERTflix Addon
+    Author Twilight0
+
+    SPDX-License-Identifier: GPL-3.0-only
+    See LICENSES/GPL-3.0-only for more information.
+'''
+
+from __future__ import absolute_import
+
+from time import time
+from xbmc import Monitor, Player, getGlobalIdleTime
+from tulip import control
+from resources.lib import navigator, net, utils
+from resources.lib.store import foreground
+from resources.lib.constants import *
+
+
+def destinations():
+
+    """
+    Cached functions behind the root menu entries, with the arguments the menu calls them with
+    """
+
+    if control.setting('nest_movies') == 'true':
+        movies = navigator.category_list
+    else:
+        movies = navigator.recursive_list_items
+
+    return [
+        (navigator.get_live, (control.setting('lazy_live') == 'true',)),
+        (navigator.recursive_list_items, ('vods',)),
+        (navigator.recursive_list_items, (NEWS_LINK,)),
+        (movies, (MOVIES_LINK,)),
+        (navigator.category_list, (SHOWS_LINK,)),
+        (navigator.category_list, (SERIES_LINK,)),
+        (movies, (DOCUMENTARIES_LINK,)),
+        (navigator.category_list, (SPORTS_LINK,)),
+        (navigator.category_list, (INFO_LINK,)),
+        (navigator.category_list, (ARCHIVE_LINK,)),
+        (navigator.category_list, (KIDS_LINK,)),
+        (navigator.index_listing, ()),
+        (navigator.district_list, ())
+    ]
+
+
+def warm_up(monitor):
+
+    budget = int(control.setting('warmup_budget') or 20) * 1048576
+    start = net.stats['bytes']
+
+    for func, args in destinations():
+
+        if monitor.abortRequested() or Player().isPlaying() or net.stats['bytes'] - start > budget:
+            break
+
+        try:
+            # stale and expired entries are refreshed before moving on, so the checks above see their downloads,
+            # fresh ones cost a cache lookup
+            with foreground():
+                func(*args)
+        except Exception:
+            pass
+
+
+def main():
+
+    monitor = Monitor()
+    last_run = 0
+    last_prune = 0
+
+    while not monitor.abortRequested():
+
+        # once a day, whether warming up is enabled or not
+        if time() - last_prune > 86400 and not Player().isPlaying():
+
+            try:
+                utils.prune_stores()
+            except Exception:
+                pass
+
+            last_prune = time()
+
+        if control.setting('warmup') == 'true':
+
+            interval = int(control.setting('warmup_interval') or 6) * 3600
+
+            if time() - last_run > interval and getGlobalIdleTime() > 120 and not Player().isPlaying():
+                warm_up(monitor)
+                last_run = time()
+
+        if monitor.waitForAbort(60):
+            break
+
+
+if __name__ == '__main__':
+
+    main()
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+'''
+    Size on disk and load time of a set of cached listings, stored as the store keeps them (compressed json with
+    shared key tables) and as plain json text. The listings are those the routes build from the replay fixtures,
+    each stored under several keys, like the pages of a browsing session.
+
+    python tests/bench_cache.py [-n RUNS] [-c COPIES]
+'''
+
+from __future__ import absolute_import, division, print_function
+
+import argparse, json, sqlite3
+from os import remove
+from os.path import exists, getsize, join
+
+import harness
+from tulip import control
+from resources.lib import navigator, store
+from resources.lib.constants import MOVIES_LINK, SHOWS_LINK
+
+
+def listings():
+
+    harness.reset()
+
+    return [
+        navigator.get_live(), navigator.recursive_list_items('vods'), navigator.recursive_list_items(harness.SERIES),
+        navigator.recursive_list_items(MOVIES_LINK), navigator.category_list(SHOWS_LINK), navigator.index_listing(),
+        navigator.sub_index_listing(harness.SHOW), navigator.district_list()
+    ]
+
+
+def write(path, entries, dumps):
+
+    if exists(path):
+        remove(path)
+
+    with sqlite3.connect(path) as dbcon:
+        dbcon.execute('CREATE TABLE store (key TEXT PRIMARY KEY, fetched REAL, value TEXT)')
+        dbcon.executemany('INSERT INTO store VALUES (?, 0, ?)', [(key, dumps(value)) for key, value in entries])
+
+    return getsize(path)
+
+
+def load(path, loads):
+
+    with sqlite3.connect(path) as dbcon:
+        return [loads(row[0]) for row in dbcon.execute('SELECT value FROM store')]
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-n', '--runs', type=int, default=9)
+    parser.add_argument('-c', '--copies', type=int, default=10)
+    args = parser.parse_args()
+
+    values = listings()
+    harness.settle()
+
+    entries = [
+        ('{0}:{1}'.format(n, c), {'value': value, 'validators': None})
+        for n, value in enumerate(values) for c in range(args.copies)
+    ]
+
+    print('{0} listings, {1} items'.format(len(entries), sum(len(v['value']) for _, v in entries)))
+    print('{0:<12}{1:>10}{2:>10}'.format('', 'KB', 'load ms'))
+
+    for name, dumps, loads in [('json text', json.dumps, json.loads), ('store', store.dumps, store.loads)]:
+
+        path = join(control.dataPath, 'bench_{0}.db'.format(name.replace(' ', '_')))
+        size = write(path, entries, dumps)
+
+        assert load(path, loads) == [v for _, v in entries]
+
+        elapsed = harness.median([harness.timed(load, path, loads)[0] for _ in range(args.runs)])
+
+        print('{0:<12}{1:>10.0f}{2:>10.1f}'.format(name, size / 1024, elapsed * 1000))
+
+
+if __name__ == '__main__':
+
+    main()
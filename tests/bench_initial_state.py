@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+'''
+    Time and peak memory of decoding the INITIAL_STATE of an ertflix page with utils.initial_state and with the
+    former parseDOM + re.sub path. The page is the html response of the replay fixtures.
+
+    python tests/bench_initial_state.py [-n RUNS]
+'''
+
+from __future__ import absolute_import, division, print_function
+
+import argparse
+
+import harness
+import legacy
+from resources.lib.constants import MOVIES_LINK
+from resources.lib.utils import initial_state
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-n', '--runs', type=int, default=9)
+    args = parser.parse_args()
+
+    html = harness.fixture(MOVIES_LINK).decode('utf-8')
+
+    assert initial_state(html) == legacy.initial_state(html)
+
+    print('page of {0:.0f} KB'.format(len(html.encode('utf-8')) / 1024))
+    print('{0:<16}{1:>10}{2:>14}'.format('', 'ms', 'peak KB'))
+
+    for name, func in [('parseDOM', legacy.initial_state), ('initial_state', initial_state)]:
+
+        elapsed = harness.median([harness.timed(func, html)[0] for _ in range(args.runs)])
+        peak = harness.peak_memory(func, html)
+
+        print('{0:<16}{1:>10.1f}{2:>14.0f}'.format(name, elapsed * 1000, peak / 1024))
+
+
+if __name__ == '__main__':
+
+    main()
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+'''
+    Time and peak memory of decorating a 2,000 item listing with its bookmark menu, the single pass of
+    navigator.bookmark_menu against the two loops listing() used to run. Items are mapped from the GetTiles
+    responses of the replay fixtures.
+
+    python tests/bench_listing.py [-n RUNS] [-s SIZE]
+'''
+
+from __future__ import absolute_import, division, print_function
+
+import argparse, json
+
+import harness
+from tulip.compat import iteritems
+from resources.lib.constants import FILTER_TILES, GET_TILES
+from resources.lib.navigator import bookmark_menu
+from resources.lib.tiles import labels, tile_item
+from resources.lib.utils import collection_post, tiles_post
+
+
+def two_passes(self_list):
+
+    for i in self_list:
+        i.update({'action': 'listing'})
+
+    for i in self_list:
+        bookmark = dict((k, v) for k, v in iteritems(i) if not k == 'next')
+        bookmark['bookmark'] = i['url']
+        i.update({'cm': [{'title': 30501, 'query': {'action': 'addBookmark', 'url': json.dumps(bookmark)}}]})
+
+    return self_list
+
+
+def single_pass(self_list):
+
+    return list(bookmark_menu(self_list, action='listing'))
+
+
+def listing(size):
+
+    ids = [t['id'] for t in json.loads(harness.fixture(FILTER_TILES, collection_post('vods', 1)))['tiles']]
+    tiles = []
+
+    for i in range(0, len(ids), 50):
+        tiles.extend(
+            json.loads(harness.fixture(GET_TILES, tiles_post([{'id': i} for i in ids[i:i + 50]])))['tiles']
+        )
+
+    labels_ = labels()
+    items = [tile_item(tiles[n % len(tiles)], labels_) for n in range(size)]
+
+    for n, i in enumerate(items):
+        i['url'] = '{0}&n={1}'.format(i['url'], n)
+        i.update({'next': collection_post('vods', 2), 'nextaction': 'listing', 'nextlabel': 30500})
+
+    return items
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-n', '--runs', type=int, default=5)
+    parser.add_argument('-s', '--size', type=int, default=2000)
+    args = parser.parse_args()
+
+    items = listing(args.size)
+
+    print('{0:<14}{1:>10}{2:>14}'.format('', 'ms', 'peak KB'))
+
+    for name, func in [('two passes', two_passes), ('single pass', single_pass)]:
+
+        times = [harness.timed(func, [dict(i) for i in items])[0] for _ in range(args.runs)]
+        peak = harness.peak_memory(func, [dict(i) for i in items])
+
+        print('{0:<14}{1:>10.1f}{2:>14.0f}'.format(name, harness.median(times) * 1000, peak / 1024))
+
+
+if __name__ == '__main__':
+
+    main()
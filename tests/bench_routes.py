@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+'''
+    Times the routes of harness.ROUTES end to end against the replay fixtures: router.main() dispatching the
+    route, the network tier answered from tests/fixtures/replay and directory.add() stubbed out. Cold runs
+    start from empty caches, warm runs repeat the route right after.
+
+    python tests/bench_routes.py [-n RUNS] [route ...]
+'''
+
+from __future__ import absolute_import, division, print_function
+
+import argparse
+
+import harness
+from resources.lib import net
+
+
+def bench(action, params, runs):
+
+    cold, warm = [], []
+
+    for _ in range(runs):
+
+        harness.reset()
+
+        requests = net.stats['requests']
+        elapsed, items = harness.timed(harness.run, action, **dict(params))
+        cold.append(elapsed)
+        requests = net.stats['requests'] - requests
+
+        harness.settle()
+
+        warm.append(harness.timed(harness.run, action, **dict(params))[0])
+
+    return harness.median(cold), harness.median(warm), requests, len(items)
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-n', '--runs', type=int, default=5)
+    parser.add_argument('routes', nargs='*', help='names of harness.ROUTES, all of them by default')
+    args = parser.parse_args()
+
+    print('{0:<22}{1:>10}{2:>10}{3:>10}{4:>8}'.format('route', 'cold ms', 'warm ms', 'requests', 'items'))
+
+    for name, action, params in harness.ROUTES:
+
+        if args.routes and name not in args.routes:
+            continue
+
+        cold, warm, requests, items = bench(action, params, args.runs)
+
+        print('{0:<22}{1:>10.1f}{2:>10.1f}{3:>10}{4:>8}'.format(name, cold * 1000, warm * 1000, requests, items))
+
+
+if __name__ == '__main__':
+
+    main()
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+'''
+    Import time of each route as router.py loads it: a fresh interpreter per run imports router and, for the
+    actions it does not handle through utils & profiler, navigator. Interpreter start up and the stand-ins of
+    the harness are left out of the timings.
+
+    python tests/bench_startup.py [-n RUNS]
+'''
+
+from __future__ import absolute_import, division, print_function
+
+import argparse, json, subprocess, sys
+
+import harness
+
+ACTIONS = [
+    'root', 'live', 'listing', 'categories', 'index', 'sub_index', 'district', 'search', 'play', 'clear_cache',
+    'settings', 'addBookmark', 'profile_summary'
+]
+
+CHILD = '''
+import json, sys
+sys.path.insert(0, {tests!r})
+import harness
+from timeit import default_timer
+modules = len(sys.modules)
+start = default_timer()
+import router
+if {action!r} not in router.UTILS_ACTIONS:
+    from resources.lib import navigator
+print(json.dumps([default_timer() - start, len(sys.modules) - modules]))
+'''
+
+
+def startup(action):
+
+    output = subprocess.check_output([sys.executable, '-c', CHILD.format(tests=harness.TESTS, action=action)])
+
+    return json.loads(output.decode('utf-8'))
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-n', '--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    print('{0:<18}{1:>10}{2:>10}'.format('action', 'ms', 'modules'))
+
+    for action in ACTIONS:
+
+        runs = [startup(action) for _ in range(args.runs)]
+
+        print('{0:<18}{1:>10.1f}{2:>10}'.format(action, harness.median([r[0] for r in runs]) * 1000, runs[0][1]))
+
+
+if __name__ == '__main__':
+
+    main()
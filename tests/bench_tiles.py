@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+'''
+    Maps a 1,000 tile GetTiles response to directory items with tiles.tile_item and with the former per tile
+    loop of recursive_list_items. The response is built from the tiles of the replay fixtures.
+
+    python tests/bench_tiles.py [-n RUNS] [-s SIZE]
+'''
+
+from __future__ import absolute_import, division, print_function
+
+import argparse, json
+
+import harness
+import legacy
+from resources.lib.tiles import labels, tile_item
+
+
+def response(size):
+
+    recorded = harness.recorded_tiles()
+    tiles = []
+
+    for n in range(size):
+        tile = dict(recorded[n % len(recorded)])
+        tile['id'] = '{0}.{1}'.format(tile['id'], n)
+        tiles.append(tile)
+
+    return json.dumps({'tiles': tiles})
+
+
+def former(tiles):
+
+    return [legacy.tile_item(t) for t in tiles]
+
+
+def current(tiles):
+
+    labels_ = labels()
+
+    return [tile_item(t, labels_) for t in tiles]
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-n', '--runs', type=int, default=9)
+    parser.add_argument('-s', '--size', type=int, default=1000)
+    args = parser.parse_args()
+
+    tiles = json.loads(response(args.size))['tiles']
+
+    print('{0:<10}{1:>10}{2:>14}'.format('', 'ms', 'us per tile'))
+
+    for name, func in [('former', former), ('tile_item', current)]:
+
+        elapsed = harness.median([harness.timed(func, tiles)[0] for _ in range(args.runs)])
+
+        print('{0:<10}{1:>10.1f}{2:>14.1f}'.format(name, elapsed * 1000, elapsed * 1e6 / len(tiles)))
+
+
+if __name__ == '__main__':
+
+    main()
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+'''
+    Runs the addon's routes on a plain Python install, with no Kodi and no network. tulip is replaced by the
+    stand-ins of tests/stubs, the data path is a temporary directory and every request is answered from the
+    responses recorded under tests/fixtures/replay (ERTFLIX_REPLAY, see resources/lib/net.py). Import this module
+    before anything from resources.
+
+    The fixture set is written by tests/make_fixtures.py. To record it from the live services instead, run a
+    benchmark with requests installed and ERTFLIX_RECORD=tests/fixtures/replay in the environment.
+'''
+
+from __future__ import absolute_import, division
+
+import json, os, sys, threading, tracemalloc
+from glob import glob
+from os.path import abspath, dirname, join
+from timeit import default_timer
+
+TESTS = dirname(abspath(__file__))
+ROOT = dirname(TESTS)
+REPLAY = join(TESTS, 'fixtures', 'replay')
+
+sys.path[:0] = [ROOT, join(TESTS, 'stubs')]
+
+if not os.environ.get('ERTFLIX_RECORD'):
+    os.environ.setdefault('ERTFLIX_REPLAY', REPLAY)
+
+from tulip import control, directory  # noqa: E402
+from tulip.compat import urlencode  # noqa: E402
+from resources.lib.constants import GET_SERIES_DETAILS, SHOWS_LINK, MOVIES_LINK, NEWS_LINK  # noqa: E402
+
+SERIES = GET_SERIES_DETAILS.format('ser.000007')
+SHOW = 'https://www.ert.gr/show/taxidia-kai-politismos/'
+QUERY = u'Ντοκιμαντέρ'
+
+# (name, action, params) of the routes timed by bench_routes.py
+ROUTES = [
+    ('live', 'live', {}),
+    ('listing', 'listing', {'url': 'vods'}),
+    ('listing (series)', 'listing', {'url': SERIES}),
+    ('listing (list page)', 'listing', {'url': NEWS_LINK}),
+    ('listing (html page)', 'listing', {'url': MOVIES_LINK}),
+    ('categories', 'categories', {'url': SHOWS_LINK}),
+    ('index', 'index', {}),
+    ('sub_index', 'sub_index', {'url': SHOW}),
+    ('district', 'district', {})
+]
+
+
+def fixture(url, post=None):
+
+    """
+    Recorded response of a request, as bytes
+    """
+
+    from resources.lib.net import fixture as path
+
+    with open(path(REPLAY, url, post.encode('utf-8') if post else None), 'rb') as f:
+        return f.read()
+
+
+def recorded_tiles():
+
+    """
+    Tiles of the GetTiles responses of the fixture set, live channels left out
+    """
+
+    tiles = {}
+
+    for path in sorted(glob(join(REPLAY, '*'))):
+
+        try:
+            with open(path, 'rb') as f:
+                response = json.loads(f.read().decode('utf-8'))
+        except ValueError:
+            continue
+
+        if isinstance(response, dict) and 'tiles' in response:
+            tiles.update((t['id'], t) for t in response['tiles'] if 'codename' in t and 'tileChannel' not in t)
+
+    return [tiles[i] for i in sorted(tiles)]
+
+
+def settle():
+
+    """
+    Waits for the background threads the addon started (prefetch, stale refreshes, region detection...)
+    """
+
+    for thread in threading.enumerate():
+        if thread is not threading.current_thread() and not thread.daemon:
+            thread.join()
+
+
+def reset():
+
+    """
+    Empties every cache tier, so that the next route runs cold
+    """
+
+    from resources.lib import utils
+
+    settle()
+    utils.clear_cache()
+    directory.reset()
+
+
+def run(action, **params):
+
+    """
+    Dispatches action the way Kodi invokes router.py and returns the items of the directory it added
+    """
+
+    import router
+
+    params['action'] = action
+    sys.argv = ['plugin://plugin.video.ert.gr/', '1', '?' + urlencode(params)]
+    directory.reset()
+
+    router.main()
+
+    return list(directory.added)
+
+
+def timed(func, *args, **kwargs):
+
+    start = default_timer()
+    result = func(*args, **kwargs)
+
+    return default_timer() - start, result
+
+
+def peak_memory(func, *args, **kwargs):
+
+    """
+    Peak of the memory allocated while func runs, in bytes
+    """
+
+    tracemalloc.start()
+
+    try:
+        func(*args, **kwargs)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def median(values):
+
+    values = sorted(values)
+    middle = len(values) // 2
+
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+'''
+    Former implementations, kept as the reference the current ones are checked and benchmarked against
+'''
+
+from __future__ import absolute_import
+
+import json, re
+from tulip import client, control
+from resources.lib.constants import VOD_LINK, GET_SERIES_DETAILS
+
+
+def tile_item(tile):
+
+    """
+    The per tile body of recursive_list_items before tiles.tile_item, minus region filtering & next page fields
+    """
+
+    title = tile['title']
+    if 'subtitle' in tile:
+        title = ' - '.join([title, tile['subtitle']])
+    try:
+        if tile.get('isEpisode'):
+            try:
+                season = ' '.join([control.lang(30063), str(tile['season']['seasonNumber'])])
+            except KeyError:
+                season = None
+            if not season:
+                subtitle = ' '.join([control.lang(30064), str(tile['episodeNumber'])])
+            else:
+                try:
+                    subtitle = ''.join(
+                        [
+                            season, ', ', control.lang(30064),
+                            ' ', str(tile['episodeNumber'])
+                        ]
+                    )
+                except KeyError:
+                    subtitle = tile['publishDate'].partition('T')[0]
+                    subtitle = '/'.join(subtitle.split('-')[::-1])
+            title = '[CR]'.join([title, subtitle])
+    except Exception:
+        pass
+
+    images = tile['images']
+    fanart = control.fanart()
+
+    if len(images) == 1:
+
+        image = images[0]['url']
+
+    else:
+
+        image_list = [
+            [i['url'] for i in images if i['isMain']], [i['url'] for i in images if i['role'] == 'hbbtv-icon'],
+            [i['url'] for i in images if i['role'] == 'photo'], [i['url'] for i in images if i['role'] == 'hbbtv-background']
+        ]
+
+        image = images[0]['url']
+
+        for i in image_list:
+            if i:
+                image = i[0]
+                break
+
+        fanart_list = [
+            [i['url'] for i in images if i['role'] == 'photo-details'],
+            [i['url'] for i in images if i['role'] == 'hbbtv-background'],
+            [i['url'] for i in images if i['role'] == 'photo' and 'ertflix-background' in i['url']]
+        ]
+
+        for f in fanart_list:
+            if f and len(f) > 1:
+                fanart = f[1]
+                break
+            elif f and len(f) == 1:
+                fanart = f[0]
+                break
+
+    codename = tile['codename']
+    vid = tile['id']
+
+    plots = [
+        tile.get('description'), tile.get('shortDescription'), tile.get('tinyDescription'), tile.get('subtitle'),
+        tile.get('subTitle')
+    ]
+
+    plot = control.lang(30014)
+
+    for p in plots:
+        if p:
+            plot = client.stripTags(p)
+            plot = client.replaceHTMLCodes(plot)
+            break
+
+    year = tile.get('year')
+
+    if not year:
+        try:
+            year = int(tile.get('productionYears')[:4])
+        except Exception:
+            year = 2021
+
+    if tile.get('hasPlayableStream') and not tile.get('type') == 'ser':
+        url = VOD_LINK.format('-'.join([vid, codename]))
+    else:
+        url = GET_SERIES_DETAILS.format(vid)
+
+    data = {
+        'title': title, 'image': image, 'fanart': fanart, 'url': url, 'plot': plot,
+        'year': year
+    }
+
+    if tile.get('durationSeconds'):
+        data.update({'duration': tile.get('durationSeconds')})
+
+    if tile.get('hasPlayableStream') and not tile.get('type') == 'ser':
+        data.update({'action': 'play', 'isFolder': 'False'})
+    else:
+        data.update({'action': 'listing'})
+
+    return data
+
+
+def initial_state(html):
+
+    """
+    INITIAL_STATE decoded the way recursive_list_items & category_list did before utils.initial_state
+    """
+
+    script = [i for i in client.parseDOM(html, 'script') if 'INITIAL_STATE' in i][0]
+    script = re.sub(r'var _*?\w+_*? = ', '', script).partition(';</script>')[0]
+    if script.endswith(';'):
+        script = script[:-1]
+
+    return json.loads(script)
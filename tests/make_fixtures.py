@@ -0,0 +1,381 @@
+# -*- coding: utf-8 -*-
+
+'''
+    Writes the replay fixture set of tests/fixtures/replay: responses shaped like the ones of the ertflix API,
+    ert.gr and webradio.ert.gr, stored under the names net.fixture() gives their requests. The set is small but
+    covers what the routes of harness.ROUTES request, including a channel whose stream cannot be acquired and a
+    listing that falls back to scraping INITIAL_STATE from its html page.
+
+    python tests/make_fixtures.py
+'''
+
+from __future__ import absolute_import
+
+import json
+from glob import glob
+from os import remove
+from os.path import join
+
+import harness
+from resources.lib.constants import *
+from resources.lib.net import fixture
+from resources.lib.utils import collection_post, live_post, search_post, tiles_post
+
+NAMES = [
+    u'Ταξίδια', u'Ιστορίες', u'Μουσική Βραδιά', u'Αθλητική Κυριακή', u'Πολιτισμός & Τέχνες', u'Ντοκιμαντέρ',
+    u'Η Ζωή Αλλιώς', u'Κυνήγι Θησαυρού', u'Ελληνικοί Δρόμοι', u'Μικρές Ιστορίες', u'Ο Τόπος μας', u'Ειδήσεις'
+]
+
+
+def write(url, body, post=None):
+
+    if not isinstance(body, bytes):
+        body = json.dumps(body, ensure_ascii=False).encode('utf-8')
+
+    with open(fixture(harness.REPLAY, url, post.encode('utf-8') if post else None), 'wb') as f:
+        f.write(body)
+
+
+def image(role, name, main=False):
+
+    return {'role': role, 'url': 'https://ertflix.img.ert.gr/{0}/{1}.jpg'.format(role, name), 'isMain': main}
+
+
+def images(n, name):
+
+    kind = n % 4
+
+    if kind == 0:
+        return [
+            image('photo', name, True), image('photo-details', name), image('hbbtv-icon', name),
+            image('hbbtv-background', name)
+        ]
+    elif kind == 1:
+        return [
+            image('poster', name), image('photo', 'ertflix-background-' + name), image('photo', name + '-2'),
+            image('photo', 'ertflix-background-' + name + '-2')
+        ]
+    elif kind == 2:
+        return [image('photo', name, True)]
+    else:
+        return [image('hbbtv-icon', name), image('hbbtv-background', name), image('hbbtv-background', name + '-2')]
+
+
+def tile(id_, n, episode=False, series=False):
+
+    name = NAMES[n % len(NAMES)]
+    codename = 'tile-{0}'.format(n)
+
+    t = {
+        'id': id_, 'codename': codename, 'title': name, 'type': 'ser' if series else 'vod',
+        'images': images(n, codename), 'hasPlayableStream': not series, 'isRegionRestrictionEnabled': n % 7 == 3,
+        'isEpisode': episode, 'publishDate': '2021-{0:02d}-{1:02d}T20:00:00'.format(n % 12 + 1, n % 28 + 1),
+        'categories': [{'id': 'cat.{0}'.format(n % 9), 'codename': 'category-{0}'.format(n % 9)}],
+        'tags': ['tag-{0}'.format(n % 5), 'tag-{0}'.format(n % 3)], 'badges': [], 'rating': None,
+        'languages': [{'code': 'el'}], 'availableUntil': '2030-01-01T00:00:00'
+    }
+
+    if n % 3:
+        t['subtitle'] = u'Επεισόδιο ' + str(n)
+
+    if n % 5 == 0:
+        t['description'] = u'<p>Μια εκπομπή για {0} &amp; όχι μόνο.</p><p>Παρουσίαση: ERT</p>'.format(name)
+    elif n % 5 == 1:
+        t['shortDescription'] = u'Σύντομη περιγραφή για {0}'.format(name)
+    elif n % 5 == 2:
+        t['tinyDescription'] = name
+
+    if n % 4 == 0:
+        t['year'] = 2000 + n % 22
+    elif n % 4 == 1:
+        t['productionYears'] = '{0}-{1}'.format(2010 + n % 10, 2011 + n % 10)
+
+    if not series:
+        t['durationSeconds'] = 1200 + n * 13
+
+    if episode:
+        t['episodeNumber'] = n
+        if n % 6:
+            t['season'] = {'seasonNumber': n % 4 + 1}
+
+    return t
+
+
+def get_tiles(tiles):
+
+    for i in range(0, len(tiles), 50):
+        chunk = tiles[i:i + 50]
+        write(GET_TILES, {'tiles': chunk}, tiles_post([{'id': t['id']} for t in chunk]))
+
+
+def live():
+
+    channels = [
+        ('ch.1', u'ΕΡΤ1 LIVE', 'ept1-live', False), ('ch.2', u'ΕΡΤ2 LIVE', 'ept2-live', False),
+        ('ch.3', u'ΕΡΤ3 LIVE', 'ept3-live', False), ('ch.4', u'ERTNEWS LIVE', 'ertnews-live', False),
+        ('ch.5', u'ERTWORLD LIVE', 'ertworld-live', False), ('ch.6', u'ΕΡΤ SPORTS LIVE', 'ertsports-live', True)
+    ]
+
+    write(FILTER_NOW_ON_TV_TILES, {'Channels': [{'Id': c[0]} for c in channels]})
+
+    tiles = []
+
+    for id_, title, codename, restricted in channels:
+
+        t = {
+            'id': id_, 'title': title, 'isRegionRestrictionEnabled': restricted,
+            'images': [image('hbbtv-icon', codename, True), image('photo', codename)]
+        }
+
+        if id_ == 'ch.5':
+            t['codename'] = codename
+        else:
+            t['tileChannel'] = {'codename': codename}
+
+        tiles.append(t)
+
+    write(GET_TILES, {'tiles': tiles}, live_post([{'id': c[0]} for c in channels]))
+
+    # the sports channel is left without one, its stream can not be acquired
+    for _, _, codename, _ in channels[:-1]:
+        write(
+            ACQUIRE_CONTENT.format(DEVICE_KEY, codename),
+            {
+                'MediaFiles': [
+                    {
+                        'RoleName': 'main', 'Formats': [
+                            {'Url': 'https://ert-live.cdn.ert.gr/{0}/index.m3u8?token=abc'.format(codename)}
+                        ]
+                    }
+                ]
+            }
+        )
+
+    write(GET_REGIONS, {'regions': [{'codename': 'gr'}]})
+
+
+def listings():
+
+    vods = [tile('vod.{0:06d}'.format(n), n, series=n % 10 == 7) for n in range(120)]
+    vods[7]['id'] = 'ser.000007'
+
+    write(
+        FILTER_TILES, {'pagination': {'page': 1, 'totalPages': 3}, 'tiles': [{'id': t['id']} for t in vods]},
+        collection_post('vods', 1)
+    )
+    get_tiles(vods)
+
+    groups = [70, 30]
+    episodes = [tile('ep.{0:06d}'.format(n), n, episode=True) for n in range(sum(groups))]
+
+    write(
+        harness.SERIES,
+        {
+            'episodeGroups': [
+                {'title': u'Κύκλος 1', 'episodes': [{'id': t['id']} for t in episodes[:groups[0]]]},
+                {'title': u'Κύκλος 2', 'episodes': [{'id': t['id']} for t in episodes[groups[0]:]]}
+            ]
+        }
+    )
+    get_tiles(episodes[:50])
+
+    # NEWS_LINK, a /list page, through GetSectionContent
+    news = [tile('news.{0:06d}'.format(n), n) for n in range(30)]
+
+    write(
+        GET_SECTION.format(1, 'eideseis'),
+        {'sectionContent': {'tilesIds': [t['id'] for t in news]}, 'pagination': {'page': 1, 'totalPages': 2}}
+    )
+    get_tiles(news)
+
+
+def categories():
+
+    sections = [
+        {'sectionContentCodename': 'adman-ekpompes', 'portalName': 'adman', 'tilesIds': ['ad.1']}
+    ]
+
+    for n, name in enumerate(NAMES[:8]):
+        sections.append(
+            {
+                'sectionContentCodename': 'ekpompes-{0}'.format(n), 'portalName': name,
+                'tilesIds': ['vod.{0:06d}'.format(i) for i in range(n * 10, n * 10 + 12)] if n != 5 else [],
+                'algorithmParameters': {'categories': [{'categoryNameTransations': {'el': {'name': name}}}]}
+            }
+        )
+
+    write(
+        GET_PAGE_CONTENT.format(1, 'ekpompes'),
+        {'sectionContents': sections, 'pagination': {'page': 1, 'totalPages': 2}}
+    )
+
+
+def search():
+
+    """
+    A remote search with two pages of results (harness.QUERY)
+    """
+
+    found = [tile('vod.{0:06d}'.format(n), n) for n in range(60, 120)]
+
+    write(SEARCH, {'tiles': [{'id': t['id']} for t in found]}, search_post(harness.QUERY))
+    get_tiles(found)
+
+
+def movies_page():
+
+    """
+    An ertflix page the way it is served to browsers, the listing is in the INITIAL_STATE script among a few
+    hundred KB of other state and markup. Its API call has no fixture, so the html is what gets parsed.
+    """
+
+    movies = [tile('mov.{0:06d}'.format(n), n) for n in range(60)]
+
+    sections = dict(
+        (
+            'movies-{0}'.format(s),
+            {
+                'sectionContentCodename': 'movies-{0}'.format(s), 'portalName': NAMES[s], 'fetchedPage': 1,
+                'totalPages': 1, 'tilesIds': [t['id'] for t in movies[s * 15:s * 15 + 15]]
+            }
+        ) for s in range(4)
+    )
+
+    state = {
+        'app': {'platform': 'www', 'language': 'el', 'features': dict(('feature{0}'.format(i), True) for i in range(50))},
+        'tiles': dict((t['id'], t) for t in movies),
+        'epg': dict(
+            ('ch.{0}'.format(c), [tile('epg.{0}.{1}'.format(c, n), n) for n in range(40)]) for c in range(5)
+        ),
+        'pages': {'sectionsByCodename': sections, 'movies': {'totalPages': 1}}
+    }
+
+    menu = u''.join(
+        u'<li class="menu-item"><a href="/show/{0}">{1}</a></li>'.format(i, NAMES[i % len(NAMES)]) for i in range(40)
+    )
+    cards = u''.join(
+        u'<div class="card"><a href="/vod/{0}"><img src="{1}" alt="{2}"/></a><span>{2}</span></div>'.format(
+            t['id'], t['images'][0]['url'], t['title']
+        ) for t in movies * 10
+    )
+
+    html = u''.join(
+        [
+            u'<!DOCTYPE html><html lang="el"><head><meta charset="utf-8"/><title>ERTFLIX</title>',
+            u''.join(u'<script src="/static/js/chunk.{0}.js"></script>'.format(i) for i in range(20)),
+            u'<script>window.dataLayer = window.dataLayer || [];</script></head><body>',
+            u'<nav><ul>', menu, u'</ul></nav><main>', cards, u'</main>',
+            u'<script>var __INITIAL_STATE__ = ', json.dumps(state, ensure_ascii=False), u';</script>',
+            u'<script>window.__ENV__ = {"api": "https://api.app.ertflix.gr"};</script></body></html>'
+        ]
+    )
+
+    write(MOVIES_LINK, html.encode('utf-8'))
+    get_tiles(movies)
+
+
+def index_pages():
+
+    shows = []
+
+    for n in range(400):
+        name = u'{0} {1}'.format(NAMES[n % len(NAMES)], n)
+        shows.append((u'https://www.ert.gr/show/show-{0}/'.format(n), name))
+
+    shows[0] = (harness.SHOW, u'Ταξίδια & Πολιτισμός')
+
+    items = u''.join(
+        u'<li{0}><a href="{2}" title="{1}">{1}</a></li>'.format(
+            u' class="hideli"' if n > 300 else u'', name.replace(u'&', u'&amp;'), url
+        ) for n, (url, name) in enumerate(shows)
+    )
+
+    html = u''.join(
+        [
+            u'<!DOCTYPE html><html><head><title>Ευρετήριο</title></head><body><ul class="menu">',
+            u''.join(u'<li><a href="/category/{0}">{0}</a></li>'.format(i) for i in range(30)),
+            u'</ul><ul class="index">', items, u'</ul></body></html>'
+        ]
+    )
+
+    write(INDEX_LINK, html.encode('utf-8'))
+
+    show = u''.join(
+        [
+            u'<!DOCTYPE html><html><head><title>Ταξίδια</title></head><body>',
+            u'<h1 class="tdb-title-text">Ταξίδια &amp; Πολιτισμός</h1>',
+            u'<div class="tdb-block-inner td-fix-index"><p>Αρχική / Εκπομπές</p></div>',
+            u'<div class="tdb-block-inner td-fix-index"><div class="intro">Εκπομπή</div>',
+            u'<p>Ταξιδεύουμε σε όλη την Ελλάδα &amp; γνωρίζουμε τους ανθρώπους της.</p></div>',
+            u'<div class="tdb-featured-image"><img width="300" height="200" ',
+            u'src="https://www.ert.gr/wp-content/uploads/2021/09/taxidia-300x200.jpg" ',
+            u'srcset="https://www.ert.gr/wp-content/uploads/2021/09/taxidia.jpg 1024w, ',
+            u'https://www.ert.gr/wp-content/uploads/2021/09/taxidia-300x200.jpg 300w" ',
+            u'sizes="(max-width: 300px) 100vw, 300px" /></div>',
+            u'<a href="https://www.ertflix.gr/series/ser.000007-taxidia" class="su-button su-button-style-default">',
+            u'Επεισόδια</a>',
+            u'<a href="https://www.ertflix.gr/vod/vod.000001-tile-1" class="su-button">Τρέιλερ</a>',
+            u'<div class="tdb-block-inner td-fix-index"><p>ΕΡΤ Α.Ε.</p></div></body></html>'
+        ]
+    )
+
+    write(harness.SHOW, show.encode('utf-8'))
+
+
+def radio_pages():
+
+    stations = [
+        ('thessalonikis', u'ΕΡΤ Θεσσαλονίκης'), ('kerkyras', u'ΕΡΤ Κέρκυρας'), ('irakleiou', u'ΕΡΤ Ηρακλείου'),
+        ('patras', u'ΕΡΤ Πάτρας'), ('ioanninon', u'ΕΡΤ Ιωαννίνων'), ('kalamatas', u'ΕΡΤ Καλαμάτας'),
+        ('rodou', u'ΕΡΤ Ρόδου'), ('tripolis', u'ΕΡΤ Τρίπολης')
+    ]
+
+    cells = u''.join(
+        u'<td><a href="{0}/liveradio/ert-{1}.html">{2}</a></td>'.format(RADIO_LINK, codename, title)
+        for codename, title in stations
+    )
+
+    write(
+        DISTRICT_LINK,
+        u'<html><head><meta charset="windows-1253"/></head><body><table><tr>{0}<td></td></tr></table></body></html>'.format(
+            cells
+        ).encode('windows-1253')
+    )
+
+    for codename, title in stations:
+
+        write(
+            '{0}/liveradio/ert-{1}.html'.format(RADIO_LINK, codename),
+            u''.join(
+                [
+                    u'<html><body><h2>', title, u'</h2>',
+                    u'<img src="{0}/wp-content/uploads/2016/06/{1}.jpg"/>'.format(RADIO_LINK, codename),
+                    u'<iframe src="{0}/embed/ert-{1}" width="300"></iframe></body></html>'.format(RADIO_LINK, codename)
+                ]
+            ).encode('windows-1253')
+        )
+
+        write(
+            '{0}/embed/ert-{1}'.format(RADIO_LINK, codename),
+            u'<html><body><script>var player = new Player({{mp3: "{0}/ert-{1}", autoplay: false}});'
+            u'</script></body></html>'.format(RADIO_STREAM.replace('http', 'https'), codename).encode('utf-8')
+        )
+
+
+def main():
+
+    for path in glob(join(harness.REPLAY, '*')):
+        remove(path)
+
+    live()
+    listings()
+    categories()
+    search()
+    movies_page()
+    index_pages()
+    radio_pages()
+
+
+if __name__ == '__main__':
+
+    main()
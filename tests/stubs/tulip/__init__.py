@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+
+'''
+    Stand-ins for the parts of script.module.tulip the addon uses, enough to run its routes outside Kodi.
+    See tests/harness.py
+'''
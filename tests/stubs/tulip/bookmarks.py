@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+'''
+    Bookmarks kept in memory, the same json payloads tulip keeps in bookmarks.db
+'''
+
+from __future__ import absolute_import
+
+import json
+
+_bookmarks = []
+
+
+def get(file_=None):
+
+    return [json.loads(b) for b in _bookmarks]
+
+
+def add(url, file_=None):
+
+    if url not in _bookmarks:
+        _bookmarks.append(url)
+
+
+def delete(url, file_=None):
+
+    key = json.loads(url)['delbookmark']
+    _bookmarks[:] = [b for b in _bookmarks if json.loads(b).get('bookmark') != key]
+
+
+def clear(table='bookmark', withyes=True, file_=None, notify=True, label_yes_no=None):
+
+    _bookmarks[:] = []
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+'''
+    FunctionCache with the expiry rules of tulip's, kept in memory
+'''
+
+from __future__ import absolute_import
+
+from functools import wraps
+from time import time
+
+_entries = {}
+
+
+class FunctionCache(object):
+
+    def cache_function(self, duration=60):
+
+        def decorator(func):
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+
+                key = (func.__module__, func.__name__, repr(args), repr(sorted(kwargs.items())))
+                entry = _entries.get(key)
+
+                if entry and time() - entry[0] < duration * 60:
+                    return entry[1]
+
+                value = func(*args, **kwargs)
+
+                if value:
+                    _entries[key] = (time(), value)
+
+                return value
+
+            return wrapper
+
+        return decorator
+
+    def reset_cache(self, notify=False, label_success=None):
+
+        _entries.clear()
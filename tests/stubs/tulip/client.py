@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+import re
+
+try:
+    from html import unescape
+except ImportError:
+    from HTMLParser import HTMLParser
+    unescape = HTMLParser().unescape
+
+from .parsers import parseDOM
+
+
+def replaceHTMLCodes(txt):
+
+    txt = re.sub(r'(&#[0-9]+)([^;^0-9]+)', r'\1;\2', txt)
+
+    return unescape(txt).replace('&quot;', '"').replace('&amp;', '&').strip()
+
+
+def stripTags(html):
+
+    return re.sub(r'<.+?>', '', html)
+
+
+def request(url, **kwargs):
+
+    raise NotImplementedError('the addon fetches through resources.lib.net')
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+try:
+    from urllib.parse import parse_qs, parse_qsl, quote, urlencode, urlparse
+except ImportError:
+    from urllib import quote, urlencode
+    from urlparse import parse_qs, parse_qsl, urlparse
+
+try:
+    from concurrent import futures as concurrent_futures
+except ImportError:
+    import futures as concurrent_futures
+
+try:
+    range = xrange
+except NameError:
+    range = range
+
+
+def iteritems(d):
+
+    return iter(d.items())
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+
+'''
+    Settings hold the defaults of resources/settings.xml and can be changed through the settings dict, lang()
+    returns the en_gb strings, the data path is a temporary directory
+'''
+
+from __future__ import absolute_import
+
+import io, re, tempfile
+from os.path import abspath, dirname, join
+
+ROOT = dirname(dirname(dirname(dirname(abspath(__file__)))))
+
+dataPath = tempfile.mkdtemp(prefix='ertflix-')
+bookmarksFile = join(dataPath, 'bookmarks.db')
+cacheFile = join(dataPath, 'cache.db')
+
+with io.open(join(ROOT, 'resources', 'settings.xml'), encoding='utf-8') as f:
+    settings = dict(re.findall(r'<setting id="(\w+)"[^>]*? default="([^"]*)"', f.read()))
+
+with io.open(join(ROOT, 'resources', 'language', 'resource.language.en_gb', 'strings.po'), encoding='utf-8') as f:
+    strings = dict((int(k), v) for k, v in re.findall(r'msgctxt "#(\d+)"\s+msgid "(.*?)"', f.read()))
+
+with io.open(join(ROOT, 'addon.xml'), encoding='utf-8-sig') as f:
+    version = re.search(r'<addon id="[^"]+" version="([^"]+)"', f.read()).group(1)
+
+info_labels = {}
+
+
+def setting(id_):
+
+    return settings.get(id_, '')
+
+
+def setSetting(id_, value):
+
+    settings[id_] = value
+
+
+def lang(id_):
+
+    return strings.get(int(id_), '')
+
+
+def addonInfo(key):
+
+    return {'id': 'plugin.video.ert.gr', 'version': version, 'path': ROOT, 'name': 'ERTflix'}.get(key, '')
+
+
+def addonmedia(name):
+
+    return join(ROOT, 'resources', 'media', name)
+
+
+def fanart():
+
+    return join(ROOT, 'fanart.jpg')
+
+
+def infoLabel(label):
+
+    return info_labels.get(label, '')
+
+
+get_info_label = infoLabel
+
+
+def transPath(path):
+
+    return path
+
+
+def kodi_version():
+
+    return 19.0
+
+
+class _Addon(object):
+
+    def __init__(self, id_=None):
+
+        self.id_ = id_
+
+    def getSetting(self, id_):
+
+        return ''
+
+
+def addon(id_=None):
+
+    return _Addon(id_)
+
+
+def addon_details(id_, fields=None):
+
+    return {'enabled': False}
+
+
+class _Dialog(object):
+
+    def __init__(self):
+
+        self.shown = []
+
+    def textviewer(self, heading='', text=''):
+
+        self.shown.append((heading, text))
+
+    def ok(self, heading='', line1=''):
+
+        self.shown.append((heading, line1))
+
+
+dialog = _Dialog()
+inputs = []
+
+
+def inputDialog(heading='', **kwargs):
+
+    return inputs.pop(0) if inputs else ''
+
+
+def sortmethods(method=None, mask=None):
+
+    pass
+
+
+def execute(command):
+
+    pass
+
+
+def sleep(ms):
+
+    pass
+
+
+def refresh():
+
+    pass
+
+
+def openSettings(query=None, id_=None):
+
+    pass
+
+
+def quit_kodi():
+
+    pass
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+
+'''
+    Instead of building list items, add() keeps the items of the last directory and resolve() the last url
+'''
+
+from __future__ import absolute_import
+
+added = []
+resolved = []
+
+
+def add(items, content=None, mediatype=None, infotype='video', **kwargs):
+
+    added[:] = list(items)
+
+
+def resolve(url, meta=None, icon=None, dash=False, manifest_type=None, inputstream_type='adaptive', headers=None,
+            mimetype=None, resolved_mode=True, live=False, verify=True):
+
+    resolved[:] = [url]
+
+
+def reset():
+
+    added[:] = []
+    resolved[:] = []
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+'''
+    parseDOM & itertags with the matching rules of tulip's, regex based like the originals so that parse timings
+    stay comparable
+'''
+
+from __future__ import absolute_import
+
+import re
+from collections import namedtuple
+
+DomMatch = namedtuple('DOMMatch', ['attrs', 'content'])
+Tag = namedtuple('Tag', ['tag', 'attributes', 'text'])
+
+_TAG = re.compile(
+    r'(?=<(?P<tag>[a-zA-Z]+)(?P<attr>.*?)(?P<end>/)?>(?:(?P<inner>.*?)</\s*(?P=tag)\s*>)?)', re.M | re.S
+)
+_ATTR = re.compile(r'''\s*(?P<key>[\w-]+)\s*(?:=\s*(?P<quote>["']?)(?P<value>.*?)(?P=quote)\s*)?''')
+_ATTRIB = re.compile(
+    r'''\s+(?P<key>[^=]+)=\s*(?:(?P<delim>["'])(?P<value1>.*?)(?P=delim)|(?P<value2>[^"'][^>\s]*))'''
+)
+
+
+def _elements(item, name, attrs):
+
+    if not attrs:
+        return re.findall(r'(<%s(?:\s[^>]*>|/?>))' % name, item, re.M | re.S | re.I)
+
+    found = None
+
+    for key, value in attrs.items():
+
+        pattern = r'''(<{0}[^>]*\s{1}=(?P<delim>['"])(.*?)(?P=delim)[^>]*>)'''.format(name, key)
+        matches = [r[0] for r in re.findall(pattern, item, re.M | re.S | re.I) if value.match(r[2])]
+
+        found = matches if found is None else [m for m in found if m in matches]
+
+    return found
+
+
+def _attribs(element):
+
+    attribs = {}
+
+    for match in _ATTRIB.finditer(element):
+        value = match.group('value1') if match.group('value1') is not None else match.group('value2')
+        attribs[match.group('key').lower().strip()] = value
+
+    return attribs
+
+
+def parse_dom(html, name='', attrs=None):
+
+    results = []
+    item = html
+
+    for element in _elements(item, name, attrs):
+
+        attribs = _attribs(element)
+
+        if element.endswith('/>'):
+            results.append(DomMatch(attribs, ''))
+            continue
+
+        start_str = '<%s' % name
+        end_str = '</%s' % name
+
+        start = item.find(element)
+        end = item.find(end_str, start)
+        pos = item.find(start_str, start + 1)
+
+        while -1 < pos < end:
+            tend = item.find(end_str, end + len(end_str))
+            if tend != -1:
+                end = tend
+            pos = item.find(start_str, pos + 1)
+
+        if start == -1 and end == -1:
+            result = ''
+        elif start > -1 and end > -1:
+            result = item[start + len(element):end]
+        elif end > -1:
+            result = item[:end]
+        else:
+            result = item[start + len(element):]
+
+        item = item[item.find(result, item.find(element)):]
+        results.append(DomMatch(attribs, result))
+
+    return results
+
+
+def parseDOM(html, name='', attrs=None, ret=False):
+
+    if attrs:
+        attrs = dict((key, re.compile(value + ('$' if value else ''))) for key, value in attrs.items())
+
+    results = parse_dom(html, name, attrs)
+
+    if ret:
+        return [r.attrs[ret.lower()] for r in results if ret.lower() in r.attrs]
+
+    return [r.content for r in results]
+
+
+def itertags(html, tag):
+
+    for match in _TAG.finditer(html):
+        if match.group('tag') == tag:
+            attrs = dict((a.group('key').lower(), a.group('value')) for a in _ATTR.finditer(match.group('attr')))
+            yield Tag(match.group('tag'), attrs, match.group('inner'))
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+
+class URLDispatcher(object):
+
+    def __init__(self):
+
+        self.routes = {}
+
+    def register(self, mode, args=None, kwargs=None):
+
+        def decorator(func):
+            self.routes[mode] = (func, args or [], kwargs or [])
+            return func
+
+        return decorator
+
+    def dispatch(self, mode, queries):
+
+        func, args, kwargs = self.routes[mode]
+
+        return func(
+            *[queries[a] for a in args], **dict((k, queries[k]) for k in kwargs if k in queries)
+        )
+
+
+urldispatcher = URLDispatcher()
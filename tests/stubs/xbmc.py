@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+
+'''
+    Stand-ins for the parts of Kodi's xbmc module service.py uses. playing and idle can be set by tests.
+'''
+
+from __future__ import absolute_import
+
+state = {'playing': False, 'idle': 0, 'abort': False}
+
+
+class Monitor(object):
+
+    def abortRequested(self):
+
+        return state['abort']
+
+    def waitForAbort(self, timeout=0):
+
+        return state['abort']
+
+
+class Player(object):
+
+    def isPlaying(self):
+
+        return state['playing']
+
+
+def getGlobalIdleTime():
+
+    return state['idle']
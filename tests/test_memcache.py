@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+import unittest
+from os.path import join
+from time import time
+
+import harness
+from tulip import cache, control
+from resources.lib import profiler
+from resources.lib.memcache import MemoryCache
+from resources.lib.store import Store
+
+
+def listing(url):
+
+    return [{'title': 'Ταξίδια', 'url': url}]
+
+
+class DiskTierTest(unittest.TestCase):
+
+    def setUp(self):
+
+        cache.FunctionCache().reset_cache()
+
+    def cached(self, memory):
+
+        return memory.cache_function(60, cache.FunctionCache().cache_function)(listing)
+
+    def remaining(self, memory):
+
+        entry = list(memory._entries.values())[0]
+
+        return entry[0] - time()
+
+    def test_computed_value_is_kept_as_long_as_on_disk(self):
+
+        memory = MemoryCache()
+        self.cached(memory)('vods')
+
+        self.assertAlmostEqual(self.remaining(memory), 3600, delta=5)
+
+    def test_value_read_from_disk_is_kept_briefly(self):
+
+        # a new process: the disk tier has the value, the memory tier does not
+        self.cached(MemoryCache())('vods')
+
+        memory = MemoryCache()
+        self.assertEqual(self.cached(memory)('vods'), listing('vods'))
+
+        self.assertLessEqual(self.remaining(memory), 300)
+
+
+class CountersTest(unittest.TestCase):
+
+    """
+    Each lookup counts once in the hits/misses of the profile summary
+    """
+
+    def setUp(self):
+
+        cache.FunctionCache().reset_cache()
+        self.before = profiler._snapshot()
+
+    def counted(self):
+
+        delta = [a - b for a, b in zip(profiler._snapshot(), self.before)]
+
+        return delta[4] + delta[6], delta[5] + delta[7]
+
+    def test_memory_in_front_of_tulip(self):
+
+        MemoryCache().cache_function(60, cache.FunctionCache().cache_function)(listing)('vods')
+
+        memory = MemoryCache()
+        cached = memory.cache_function(60, cache.FunctionCache().cache_function)(listing)
+        cached('vods')
+        cached('vods')
+
+        # computed, read from disk, read from memory
+        self.assertEqual(self.counted(), (2, 1))
+
+    def test_memory_in_front_of_the_store(self):
+
+        store = Store(join(control.dataPath, 'counters.db'), 'counters')
+        store.clear()
+
+        store.cache_function(60, lambda: 0, MemoryCache())(listing)('vods')
+
+        cached = store.cache_function(60, lambda: 0, MemoryCache())(listing)
+        cached('vods')
+        cached('vods')
+
+        # computed, read from the store, read from memory
+        self.assertEqual(self.counted(), (2, 1))
+
+
+if __name__ == '__main__':
+
+    unittest.main()
@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+import json
+import unittest
+from threading import Event
+from time import time
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+import harness
+from resources.lib import navigator, net, utils
+from resources.lib.constants import GET_PAGE_CONTENT, GET_SECTION, MOVIES_LINK, NEWS_LINK, SHOWS_LINK
+from resources.lib.store import foreground
+
+
+class IndexTest(unittest.TestCase):
+
+    def setUp(self):
+
+        harness.reset()
+
+    def test_items_open_their_show(self):
+
+        items = harness.run('index')
+
+        self.assertEqual(len(items), 400)
+
+        for i in items:
+            self.assertEqual(i['action'], 'sub_index')
+
+    def test_items_can_be_bookmarked(self):
+
+        for i in harness.run('index'):
+
+            query = i['cm'][0]['query']
+            bookmark = json.loads(query['url'])
+
+            self.assertEqual(query['action'], 'addBookmark')
+            self.assertEqual(bookmark['bookmark'], i['url'])
+            self.assertEqual(bookmark['action'], 'sub_index')
+
+
+class SeriesTest(unittest.TestCase):
+
+    def setUp(self):
+
+        harness.reset()
+
+    def test_episodes_are_paged_by_group(self):
+
+        # groups of 70 & 30 episodes
+        pages = [navigator.series_tiles('&episodePage='.join([harness.SERIES, str(p)]))[0] for p in [1, 2, 3]]
+
+        self.assertEqual([len(p) for p in pages], [50, 20, 30])
+
+    def test_page_past_the_end_is_the_last_page(self):
+
+        tiles, page, total_pages, _ = navigator.series_tiles(harness.SERIES + '&episodePage=5')
+
+        self.assertEqual((len(tiles), page, total_pages), (30, 3, 3))
+
+
+class ApiLinkTest(unittest.TestCase):
+
+    def setUp(self):
+
+        harness.reset()
+        self.request = net.request
+
+    def test_only_ertflix_pages_have_api_calls(self):
+
+        self.assertEqual(navigator.api_link(SHOWS_LINK), GET_PAGE_CONTENT.format(1, 'ekpompes'))
+        self.assertEqual(navigator.api_link(NEWS_LINK), GET_SECTION.format(1, 'eideseis'))
+        self.assertIsNone(navigator.api_link('https://www.ert.gr/show/taxidia-kai-politismos'))
+
+    def test_list_page_through_the_api(self):
+
+        items = harness.run('listing', url=NEWS_LINK)
+
+        self.assertEqual(len(items), 30)
+        self.assertEqual(items[-1]['next'], GET_SECTION.format(2, 'eideseis'))
+
+    def empty(self, url, **kwargs):
+
+        if url == navigator.api_link(MOVIES_LINK):
+            return {'sectionContents': [], 'pagination': {'page': 1, 'totalPages': 1}}
+
+        return self.request(url, **kwargs)
+
+    def test_empty_api_page_falls_back_to_the_html_page(self):
+
+        with mock.patch.object(net, 'request', self.empty):
+            items = harness.run('listing', url=MOVIES_LINK)
+            categories = navigator.category_list(MOVIES_LINK)
+
+        self.assertEqual(len(items), 60)
+        self.assertEqual(len(categories), 4)
+
+
+class SearchTest(unittest.TestCase):
+
+    def setUp(self):
+
+        harness.reset()
+        self.region = dict(utils._region)
+        utils._region['allowed'] = True
+
+    def tearDown(self):
+
+        utils._region.clear()
+        utils._region.update(self.region)
+
+    def search(self, query, **params):
+
+        return harness.run('search', url=json.dumps(dict(params, query=query)))
+
+    def test_menu_opens_without_a_url(self):
+
+        utils.recent_store.set('ταξιδια', u'Ταξίδια')
+
+        items = harness.run('search')
+
+        self.assertEqual([i['title'] for i in items], [harness.control.lang(30056), u'Ταξίδια'])
+        self.assertEqual(json.loads(items[1]['url']), {'query': u'Ταξίδια'})
+
+    def test_cancelled_input_lists_no_results(self):
+
+        items = self.search(None)
+
+        self.assertEqual([i['title'] for i in items], [harness.control.lang(30071)])
+
+    def test_local_index_answers_first(self):
+
+        harness.run('index')
+
+        with mock.patch.object(navigator, 'remote_search') as remote:
+            items = self.search(u'ΤΑΞΙΔΙΑ πολιτισμος')
+
+        self.assertFalse(remote.called)
+        self.assertEqual([i['url'] for i in items], [harness.SHOW])
+
+    def test_remote_results_are_paged(self):
+
+        first = self.search(harness.QUERY)
+        second = harness.run('search', url=first[-1]['next'])
+
+        self.assertEqual((len(first), len(second)), (50, 10))
+        self.assertEqual(json.loads(first[-1]['next']), {'query': harness.QUERY, 'page': 2})
+        self.assertNotIn('next', second[-1])
+        self.assertEqual(utils.recent_store.latest(), [harness.QUERY])
+
+
+class LiveTest(unittest.TestCase):
+
+    def setUp(self):
+
+        harness.reset()
+        self.region = dict(utils._region)
+        utils._region['allowed'] = True
+
+    def tearDown(self):
+
+        utils._region.clear()
+        utils._region.update(self.region)
+
+    def test_channel_failing_to_resolve_is_kept_for_the_play_route(self):
+
+        items = harness.run('live')
+
+        self.assertEqual(len(items), 6)
+        self.assertIn('.m3u8', items[0]['url'])
+        # the fixture set has no AcquireContent response for the last channel
+        self.assertIn('AcquireContent', items[-1]['url'])
+
+    def test_malformed_tile_is_left_out(self):
+
+        self.assertIsNone(navigator._live_loop({'title': 'ΕΡΤ1 LIVE', 'images': []}))
+
+
+class DistrictTest(unittest.TestCase):
+
+    def setUp(self):
+
+        harness.reset()
+
+        # every station resolved two days ago
+        for s in navigator.district_stations():
+            utils.station_store.set(
+                s['href'], {'item': {'title': s['title'], 'url': s['href']}, 'validators': None, 'healthy': True},
+                time() - 172800
+            )
+
+    def test_cold_run_is_not_held_up_by_the_host_limit(self):
+
+        utils.station_store.clear()
+
+        elapsed, items = harness.timed(harness.run, 'district')
+
+        # 16 pages, all on webradio.ert.gr, read from the fixture set
+        self.assertEqual(len(items), 8)
+        self.assertLess(elapsed, 1)
+
+    def test_stale_stations_are_listed_from_the_cache(self):
+
+        with mock.patch.object(navigator, 'refresh_stations') as refresh:
+            items = navigator.district_list()
+
+        self.assertEqual(len(items), 8)
+        self.assertEqual(len(refresh.call_args[0][0]), 8)
+
+    def test_one_background_refresh_at_a_time(self):
+
+        calls = []
+        done = Event()
+
+        def resolve_stations(stations):
+            calls.append(len(stations))
+            done.wait(5)
+
+        with mock.patch.object(navigator, 'resolve_stations', resolve_stations):
+            navigator.district_list()
+            navigator.district_list()
+            done.set()
+            harness.settle()
+
+        self.assertEqual(calls, [8])
+
+    def test_refresh_is_done_before_returning_in_the_foreground(self):
+
+        with mock.patch.object(navigator, 'resolve_stations') as resolve_stations, foreground():
+            navigator.district_list()
+            self.assertEqual(len(resolve_stations.call_args[0][0]), 8)
+
+        # and the next refresh is not held up
+        self.assertTrue(navigator._stations_refresh.acquire(False))
+        navigator._stations_refresh.release()
+
+
+class RegionTest(unittest.TestCase):
+
+    def setUp(self):
+
+        harness.reset()
+        self.region = dict(utils._region)
+
+    def tearDown(self):
+
+        utils._region.clear()
+        utils._region.update(self.region)
+
+    def detected(self, allowed):
+
+        utils._region.clear()
+        utils._region['allowed'] = allowed
+
+    def test_listing_cached_while_allowed_is_filtered_once_not(self):
+
+        self.detected(True)
+        everything = harness.run('listing', url='vods')
+
+        self.detected(False)
+        filtered = harness.run('listing', url='vods')
+
+        # every 7th tile of the fixture, starting with the 4th, is region restricted
+        self.assertEqual(len(everything), 120)
+        self.assertEqual(len(filtered), 120 - 17)
+
+    def test_flag_stays_off_items_and_bookmarks(self):
+
+        self.detected(True)
+
+        for i in harness.run('listing', url='vods'):
+            self.assertNotIn('restricted', i)
+            self.assertNotIn('restricted', json.loads(i['cm'][0]['query']['url']))
+
+    def test_live_cached_while_allowed_is_filtered_once_not(self):
+
+        harness.control.setSetting('lazy_live', 'true')
+
+        try:
+            self.detected(True)
+            everything = harness.run('live')
+            self.detected(False)
+            filtered = harness.run('live')
+        finally:
+            harness.control.setSetting('lazy_live', 'false')
+
+        self.assertEqual([i['title'] for i in everything][:-1], [i['title'] for i in filtered])
+
+
+if __name__ == '__main__':
+
+    unittest.main()
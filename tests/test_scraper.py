@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+import unittest
+from threading import Lock
+from time import sleep
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+import harness
+from resources.lib import net
+from resources.lib.scraper import Scraper
+
+
+class HostLimitTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.open = {}
+        self.peak = {}
+        self.lock = Lock()
+
+    def request(self, url, **kwargs):
+
+        host = url.split('/')[2]
+
+        with self.lock:
+            self.open[host] = self.open.get(host, 0) + 1
+            self.peak[host] = max(self.peak.get(host, 0), self.open[host])
+
+        sleep(0.05)
+
+        with self.lock:
+            self.open[host] -= 1
+
+        return url
+
+    def test_requests_to_a_host_are_bounded_not_spaced(self):
+
+        urls = ['https://{0}/{1}'.format(host, n) for host in ['a', 'b'] for n in range(8)]
+
+        with mock.patch.object(net, 'request', self.request):
+            elapsed, results = harness.timed(Scraper(workers=8, connections=2).map, lambda u, s: s.fetch(u), urls)
+
+        self.assertEqual(results, urls)
+        self.assertEqual(self.peak, {'a': 2, 'b': 2})
+        # 8 requests to each host, 2 at a time
+        self.assertLess(elapsed, 0.4)
+
+
+if __name__ == '__main__':
+
+    unittest.main()
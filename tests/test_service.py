@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+import unittest
+from os.path import join
+from time import sleep, time
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+import harness
+import service
+import xbmc
+from tulip import control
+from resources.lib import net
+from resources.lib.store import Store, cache_key
+
+
+def page(url):
+
+    # a download of 1 MB
+    sleep(0.05)
+    net.stats['bytes'] += 1048576
+
+    return [{'title': url, 'url': url}]
+
+
+class WarmUpTest(unittest.TestCase):
+
+    def setUp(self):
+
+        harness.reset()
+
+        self.store = Store(join(control.dataPath, 'service.db'), 'service')
+        self.store.clear()
+        self.called = []
+
+        cached = self.store.cache_function(60, lambda: 60)(self.page)
+
+        # both pages were fetched an hour and a half ago, they are stale
+        for url in ['a', 'b']:
+            self.store.set(cache_key(self.page, (url,)), {'value': [], 'validators': None}, time() - 5400)
+
+        self.destinations = [(cached, ('a',)), (cached, ('b',))]
+
+    def tearDown(self):
+
+        control.setSetting('warmup_budget', '20')
+        xbmc.state['playing'] = False
+
+    def page(self, url):
+
+        self.called.append(url)
+
+        # e.g. the user starting a video while the page downloads
+        if getattr(self, 'starts_playback', False):
+            xbmc.state['playing'] = True
+
+        return page(url)
+
+    def warm_up(self):
+
+        with mock.patch.object(service, 'destinations', lambda: self.destinations):
+            service.warm_up(xbmc.Monitor())
+
+        harness.settle()
+
+    def test_stale_pages_are_refreshed_before_moving_on(self):
+
+        self.warm_up()
+
+        self.assertEqual(self.called, ['a', 'b'])
+        self.assertEqual(self.store.get(cache_key(self.page, ('b',)))[1]['value'], page('b'))
+
+    def test_budget_stops_after_the_refresh_exceeding_it(self):
+
+        control.setSetting('warmup_budget', '0')
+
+        self.warm_up()
+
+        self.assertEqual(self.called, ['a'])
+
+    def test_playback_stops_the_refreshes(self):
+
+        self.starts_playback = True
+
+        self.warm_up()
+
+        self.assertEqual(self.called, ['a'])
+
+class PruneTest(unittest.TestCase):
+
+    def tearDown(self):
+
+        xbmc.state['abort'] = False
+
+    def test_stores_are_pruned_with_warm_up_off(self):
+
+        def prune_stores():
+            xbmc.state['abort'] = True
+
+        with mock.patch.object(service.utils, 'prune_stores', side_effect=prune_stores) as prune:
+            service.main()
+
+        self.assertEqual(prune.call_count, 1)
+
+
+if __name__ == '__main__':
+
+    unittest.main()
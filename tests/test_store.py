@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+import unittest
+from os.path import join
+from threading import Event
+from time import time
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+import harness
+from tulip import control
+from resources.lib import net, utils
+from resources.lib.search import SearchIndex
+from resources.lib.store import Store, cache_key
+
+PAGE = 'https://www.ertflix.gr/show/ekpompes'
+
+
+class StoreTest(unittest.TestCase):
+
+    """
+    Store.cache_function with entries aged through Store.set(..., fetched=...)
+    """
+
+    duration = 60
+
+    def setUp(self):
+
+        harness.reset()
+
+        self.store = Store(join(control.dataPath, 'test.db'), 'test')
+        self.store.clear()
+        self.calls = []
+        self.stale = 0
+        self.refreshing = Event()
+        self.refreshing.set()
+        self.empty = False
+
+    def page(self, url):
+
+        # tests clear refreshing to hold fetches until they set it
+        self.refreshing.wait(5)
+        self.calls.append(url)
+
+        if self.empty:
+            return []
+
+        return [{'title': u'Εκπομπές', 'url': url, 'fetch': len(self.calls)}]
+
+    def cached(self):
+
+        return self.store.cache_function(self.duration, lambda: self.stale)(self.page)
+
+    def age(self, minutes, value=None, validators=None):
+
+        self.store.set(
+            cache_key(self.page, (PAGE,)), {'value': value or [{'title': u'Παλιό'}], 'validators': validators},
+            time() - minutes * 60
+        )
+
+    def fetched(self):
+
+        return self.store.get(cache_key(self.page, (PAGE,)))[0]
+
+
+class StaleWhileRevalidateTest(StoreTest):
+
+    def setUp(self):
+
+        super(StaleWhileRevalidateTest, self).setUp()
+
+        # an hour fresh, then up to an hour stale
+        self.stale = 60
+
+    def test_fresh_entry_is_returned_as_is(self):
+
+        self.age(30)
+
+        self.assertEqual(self.cached()(PAGE), [{'title': u'Παλιό'}])
+        harness.settle()
+        self.assertEqual(self.calls, [])
+
+    def test_stale_entry_is_returned_at_once_and_refreshed_in_the_background(self):
+
+        self.age(90)
+        self.refreshing.clear()
+
+        value = self.cached()(PAGE)
+        self.assertEqual(self.calls, [])
+
+        self.refreshing.set()
+        harness.settle()
+
+        self.assertEqual(value, [{'title': u'Παλιό'}])
+        self.assertEqual(self.calls, [PAGE])
+        self.assertAlmostEqual(self.fetched(), time(), delta=5)
+        self.assertEqual(self.cached()(PAGE), [{'title': u'Εκπομπές', 'url': PAGE, 'fetch': 1}])
+
+    def test_entry_past_max_stale_blocks_on_a_fresh_fetch(self):
+
+        self.age(150)
+
+        self.assertEqual(self.cached()(PAGE), [{'title': u'Εκπομπές', 'url': PAGE, 'fetch': 1}])
+
+    def test_no_max_stale_is_plain_expiry(self):
+
+        self.stale = 0
+        self.age(61)
+
+        self.assertEqual(self.cached()(PAGE), [{'title': u'Εκπομπές', 'url': PAGE, 'fetch': 1}])
+
+    def test_one_refresh_of_an_entry_at_a_time(self):
+
+        self.age(90)
+        self.refreshing.clear()
+
+        cached = self.cached()
+        values = [cached(PAGE) for _ in range(3)]
+
+        self.refreshing.set()
+        harness.settle()
+
+        self.assertEqual(values, [[{'title': u'Παλιό'}]] * 3)
+        self.assertEqual(self.calls, [PAGE])
+
+    def test_empty_result_does_not_replace_the_entry(self):
+
+        self.age(150)
+        self.empty = True
+
+        self.assertEqual(self.cached()(PAGE), [])
+        self.assertEqual(self.store.get(cache_key(self.page, (PAGE,)))[1]['value'], [{'title': u'Παλιό'}])
+
+
+class RevalidateTest(StoreTest):
+
+    validators = [[PAGE, '"v1"', None]]
+
+    def test_unchanged_page_keeps_the_entry_and_resets_its_age(self):
+
+        self.age(120, validators=self.validators)
+
+        with mock.patch.object(net, 'modified', return_value=False) as modified:
+            value = self.cached()(PAGE)
+
+        modified.assert_called_once_with(PAGE, '"v1"', None)
+        self.assertEqual(value, [{'title': u'Παλιό'}])
+        self.assertEqual(self.calls, [])
+        self.assertAlmostEqual(self.fetched(), time(), delta=5)
+
+    def test_changed_page_refreshes_the_entry(self):
+
+        self.age(120, validators=self.validators)
+
+        with mock.patch.object(net, 'modified', return_value=True):
+            value = self.cached()(PAGE)
+
+        self.assertEqual(self.calls, [PAGE])
+        self.assertEqual(value, [{'title': u'Εκπομπές', 'url': PAGE, 'fetch': 1}])
+        self.assertEqual(self.store.get(cache_key(self.page, (PAGE,)))[1]['value'], value)
+
+
+class Response(object):
+
+    def __init__(self, status_code, content=b'', headers=None):
+
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+
+        pass
+
+
+class ChangedBodyTest(unittest.TestCase):
+
+    """
+    A conditional request finding the page changed is the download of its refresh
+    """
+
+    def setUp(self):
+
+        self.session = mock.Mock()
+        patches = [
+            mock.patch.object(net, '_session', self.session), mock.patch.dict('os.environ', {'ERTFLIX_REPLAY': ''})
+        ]
+
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_body_is_reused_and_counted_once(self):
+
+        self.session.get.return_value = Response(200, b'<html>new</html>', {'ETag': '"v2"'})
+        requests = net.stats['requests']
+
+        self.assertFalse(net.unchanged([[PAGE, '"v1"', None]]))
+
+        net.record()
+        html = net.request(PAGE)
+
+        self.assertEqual(html, u'<html>new</html>')
+        self.assertEqual(net.recorded(), [[PAGE, '"v2"', None]])
+        self.assertEqual(self.session.get.call_count, 1)
+        self.assertEqual(self.session.get.call_args[1]['headers'], {'If-None-Match': '"v1"'})
+        self.assertEqual(net.stats['requests'] - requests, 1)
+
+    def test_not_modified_keeps_nothing(self):
+
+        self.session.get.return_value = Response(304)
+
+        self.assertTrue(net.unchanged([[PAGE, '"v1"', None]]))
+
+        self.session.get.return_value = Response(200, b'<html>new</html>')
+        net.request(PAGE)
+
+        self.assertEqual(self.session.get.call_count, 2)
+
+
+class PruneTest(unittest.TestCase):
+
+    def setUp(self):
+
+        harness.reset()
+
+    def test_expired_entries_are_deleted(self):
+
+        store = Store(join(control.dataPath, 'test.db'), 'test')
+        store.clear()
+
+        store.set('search:old', [1], time() - 7200)
+        store.set('search:new', [2])
+        store.set('region', [True, []], time() - 7200)
+
+        store.prune(3600, 'search:')
+
+        self.assertEqual(sorted(store.items()), ['region', 'search:new'])
+
+    def test_terms_of_pruned_documents_are_deleted(self):
+
+        index = SearchIndex(join(control.dataPath, 'test.db'), 'docs')
+        index.clear()
+
+        document = {'item': {'title': u'Ταξίδια'}, 'restricted': False}
+        index.add([('tile:1', u'Ταξίδια', document), ('idx:1', u'Ταξίδια', document)])
+        index.set('tile:1', document, time() - 7200)
+        index.set('idx:1', document, time() - 7200)
+
+        index.prune(3600, 'tile:')
+
+        self.assertEqual(len(index.search(u'ταξιδια')), 1)
+
+        with index._connect() as dbcon:
+            self.assertEqual(dbcon.execute('SELECT key FROM terms').fetchall(), [('idx:1',)])
+
+    def test_recent_searches_are_trimmed(self):
+
+        for n in range(30):
+            utils.recent_store.set(str(n), str(n), time() - 30 + n)
+
+        utils.prune_stores()
+
+        self.assertEqual(utils.recent_store.latest(100), [str(n) for n in range(29, 9, -1)])
+
+    def test_stores_keep_what_they_still_return(self):
+
+        harness.run('listing', url='vods')
+        tiles = len(utils.tile_store.items())
+
+        utils.prune_stores()
+
+        self.assertEqual(len(utils.tile_store.items()), tiles)
+        self.assertEqual(len(utils.search_index.search(u'ταξιδια')), 10)
+
+
+if __name__ == '__main__':
+
+    unittest.main()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+import json
+import unittest
+
+import harness
+import legacy
+from resources.lib import tiles
+from resources.lib.constants import FILTER_TILES
+from resources.lib.utils import collection_post, tile_store
+
+
+def vods():
+
+    return [{'id': t['id']} for t in json.loads(harness.fixture(FILTER_TILES, collection_post('vods', 1)))['tiles']]
+
+
+class TileItemTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.tiles = harness.recorded_tiles()
+
+    def test_fixture_covers_every_image_layout(self):
+
+        layouts = set(tuple(sorted(set(i['role'] for i in t['images']))) for t in self.tiles)
+
+        self.assertGreaterEqual(len(layouts), 4)
+        self.assertGreater(len(self.tiles), 200)
+
+    def test_same_items_as_the_former_loop(self):
+
+        labels = tiles.labels()
+
+        for tile in self.tiles:
+            self.assertEqual(tiles.tile_item(tile, labels), legacy.tile_item(tile), tile['id'])
+
+    def test_artwork(self):
+
+        images = [
+            {'role': 'poster', 'url': 'poster.jpg', 'isMain': False},
+            {'role': 'photo', 'url': 'ertflix-background-1.jpg', 'isMain': False},
+            {'role': 'photo', 'url': 'photo.jpg', 'isMain': False},
+            {'role': 'photo', 'url': 'ertflix-background-2.jpg', 'isMain': False}
+        ]
+
+        self.assertEqual(tiles.artwork(images, 'fanart.jpg'), ('ertflix-background-1.jpg', 'ertflix-background-2.jpg'))
+        self.assertEqual(tiles.artwork(images[:1], 'fanart.jpg'), ('poster.jpg', 'fanart.jpg'))
+
+
+class FetchTest(unittest.TestCase):
+
+    def setUp(self):
+
+        harness.reset()
+
+    def test_chunks_are_merged_in_order(self):
+
+        requested = vods()
+
+        self.assertEqual([t['id'] for t in tiles.fetch_tiles(requested)], [r['id'] for r in requested])
+
+    def test_failed_chunk_fails_the_call(self):
+
+        # the fixture set has no GetTiles response for the second chunk
+        requested = vods()[:50] + [{'id': 'vod.missing.{0}'.format(n)} for n in range(10)]
+
+        with self.assertRaises(tiles.IncompleteTiles) as raised:
+            tiles.fetch_tiles(requested, retries=0)
+
+        self.assertEqual(len(raised.exception.tiles), 50)
+
+    def test_tiles_of_the_other_chunks_are_kept(self):
+
+        requested = vods()[:50] + [{'id': 'vod.missing.{0}'.format(n)} for n in range(10)]
+
+        with self.assertRaises(tiles.IncompleteTiles):
+            tiles.get_tiles(requested, retries=0)
+
+        self.assertEqual(len(tile_store.get_many(r['id'] for r in requested)), 50)
+
+
+if __name__ == '__main__':
+
+    unittest.main()
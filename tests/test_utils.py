@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+import harness
+import legacy
+from resources.lib import net
+from resources.lib.constants import MOVIES_LINK
+from resources.lib.utils import initial_state
+
+
+class InitialStateTest(unittest.TestCase):
+
+    def test_same_state_as_the_former_path(self):
+
+        html = harness.fixture(MOVIES_LINK).decode('utf-8')
+
+        self.assertEqual(initial_state(html), legacy.initial_state(html))
+
+    def test_page_without_state(self):
+
+        with self.assertRaises(ValueError):
+            initial_state(u'<html><script>var x = 1;</script></html>')
+
+
+class UnchangedTest(unittest.TestCase):
+
+    validators = [['https://a/1', '"etag"', None], ['https://b/2', None, 'Mon, 18 Oct 2021 10:00:00 GMT']]
+
+    def test_check_makes_the_requests(self):
+
+        calls = []
+
+        with mock.patch.object(net, 'modified', side_effect=AssertionError):
+            self.assertTrue(net.unchanged(self.validators, lambda *v: calls.append(v[0]) or False))
+
+        self.assertEqual(calls, ['https://a/1', 'https://b/2'])
+
+    def test_stops_at_the_first_changed_page(self):
+
+        with mock.patch.object(net, 'modified', return_value=True) as modified:
+            self.assertFalse(net.unchanged(self.validators))
+
+        self.assertEqual(modified.call_count, 1)
+
+    def test_pages_without_validators_are_changed(self):
+
+        self.assertFalse(net.unchanged([['https://a/1', None, None]]))
+        self.assertFalse(net.unchanged(None))
+
+
+if __name__ == '__main__':
+
+    unittest.main()